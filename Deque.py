@@ -1,12 +1,22 @@
 ######################
 # Deque.py
 ######################
-"""Defines all necessary objects and methods to use a deque"""
+"""
+Defines all necessary objects and methods to use a deque. Deque links one Node
+per element, while BlockDeque keeps its elements in a doubly linked list of
+fixed-size blocks, so it allocates once per BLOCK_LEN pushes
+"""
+import asyncio
+import threading
+from itertools import islice
+# number of elements a BlockDeque block holds
+BLOCK_LEN = 64
 class Node:
     """
     A Node Object that holds data and points to the object
     in front of it and behind it in a Deque
     """
+    __slots__ = ('data', 'next', 'prior')
     def __init__(self, data=None):
         """Initializes a Node with data"""
         self.data = data
@@ -20,12 +30,10 @@ class Deque:
         """
         Initializes an empty Deque
         """
-        # initialize an empty node
-        emptyNode = Node()
         # empty deque has size 0
         self.size = 0
-        # front and back of deque are empty Nodes
-        self.front = self.back = emptyNode
+        # an empty deque has no front or back node, as after clear()
+        self.front = self.back = None
     def __len__(self):
         """
         Computes the number of elements in the Deque
@@ -170,17 +178,112 @@ class Deque:
             current = current.prior
     def extend(self, other):
         """
-        Takes a Deque object and adds each of its elements to the back of self
-        :param other: A Deque object
+        Adds each element of an iterable to the back of self, including any
+        that are None
+        :param other: A Deque or other iterable
         """
-        # iterate through other deque
+        # extending by itself would keep finding the elements it pushes
+        if other is self:
+            other = list(other)
         for item in other:
-            # if the current item's data is None
-            if item is None:
-                # that deque is empty, so we're done
-                break
-            # if other deque has items, push back current item and loop
             self.push_back(item)
+    def splice(self, other):
+        """
+        Moves every element of another Deque to the back of self in O(1), by
+        linking its nodes on. other is left empty
+        :param other: A Deque, or another deque whose elements are copied
+        """
+        if other is self:
+            raise ValueError('cannot splice a deque onto itself')
+        if not isinstance(other, Deque):
+            self.extend(other)
+            other.clear()
+            return
+        if other.size == 0:
+            return
+        if self.size == 0:
+            self.front = other.front
+        else:
+            # other's front goes behind our back
+            self.back.prior = other.front
+            other.front.next = self.back
+        self.back = other.back
+        self.size += other.size
+        other.clear()
+    def split_at(self, index):
+        """
+        Cuts the Deque in two, keeping the elements before index. Finding the
+        node takes a walk from the nearer end, and the cut itself is O(1)
+        :param index: position of the first element to move out, from 0 to
+        len(self)
+        :return: a new Deque of the elements from index on
+        """
+        if not 0 <= index <= self.size:
+            raise IndexError(index)
+        tail = Deque()
+        if index == self.size:
+            return tail
+        first = self.locate(index)
+        tail.front = first
+        tail.back = self.back
+        tail.size = self.size - index
+        self.back = first.next
+        self.size = index
+        first.next = None
+        if self.back is None:
+            self.front = None
+        else:
+            self.back.prior = None
+        return tail
+    def locate(self, index):
+        """
+        Finds the node at a position, walking from whichever end is nearer
+        :param index: position of the node, from 0 to len(self) - 1
+        :return: the node
+        """
+        # nodes link to the back through prior and to the front through next
+        if index < self.size // 2:
+            current = self.front
+            for _ in range(index):
+                current = current.prior
+        else:
+            current = self.back
+            for _ in range(self.size - 1 - index):
+                current = current.next
+        return current
+    def __getitem__(self, index):
+        """
+        Gets the element at a position, walking from whichever end is nearer
+        :param index: position of the element, negative ones counting from the
+        back
+        :return: the element
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.locate(index).data
+    def rotate(self, n=1):
+        """
+        Rotates the Deque n steps to the right, moving the last n elements to
+        the front, or to the left if n is negative. Only the links at the new
+        ends change
+        :param n: number of steps
+        """
+        if self.size == 0:
+            return
+        n %= self.size
+        if n == 0:
+            return
+        # the old ends join up and the deque is cut in front of its new front
+        new_front = self.locate(self.size - n)
+        new_back = new_front.next
+        self.back.prior = self.front
+        self.front.next = self.back
+        new_front.next = None
+        new_back.prior = None
+        self.front = new_front
+        self.back = new_back
     def drop_between(self, start, end):
         """
         Deletes elements from the Deque that within the range [start, end)
@@ -190,35 +293,21 @@ class Deque:
         # catch all invalid args and throw an Index error if true
         if start < 0 or end > self.size or start > end:
             raise IndexError()
-        # initialize node counter to 0
-        counter = 0
-        # current node for looping is front node
-        current = self.front
-        # while current node isn't None
-        while current is not None:
-            # if it's position is within start and end args
-            if start <= counter < end:
-                # skip the current node in the deque, effectively
-                # deleting it
-                current.prior.next = current.next
-                # if current node's next is empty
-                if current.next is None:
-                    # you have one node left, and you have to get
-                    # rid of it, so clear the deque and break
-                    self.size = 0
-                    self.front = None
-                    self.back = None
-                    break
-                # set next node's prior to current's prior, effectively
-                # skipping the current node in deque
-                current.next.prior = current.prior
-                # decrement size of deque
-                self.size -= 1
-            # add one to the counter
-            counter += 1
-            # move on to the next node who flows. He nose dove and sold
-            # nada :)
-            current = current.prior
+        if start == end:
+            return
+        # find the ends of the range from whichever end of the deque is
+        # nearer, then link the nodes on either side of it to each other
+        before = self.locate(start).next
+        after = self.locate(end - 1).prior
+        if before is None:
+            self.front = after
+        else:
+            before.prior = after
+        if after is None:
+            self.back = before
+        else:
+            after.next = before
+        self.size -= end - start
     def count_if(self, criteria):
         """
         counts how many elements of the Deque satisfy the criteria
@@ -248,4 +337,888 @@ class Deque:
         :return: A string
         """
         return 'Deque([{0}])'.format(','.join(str(item) for item in self))
-        
+class Block:
+    """
+    A fixed-size block of a BlockDeque. The elements are data[lo:hi] from
+    front to back, and the block links to the blocks in front of it and behind
+    it like a Node does
+    """
+    __slots__ = ('data', 'lo', 'hi', 'next', 'prior')
+    def __init__(self, start=BLOCK_LEN // 2):
+        """
+        Initializes an empty block
+        :param start: index the first element pushed goes next to. Blocks
+        added at the back fill from 0 and blocks added at the front from the
+        end
+        """
+        self.data = [None] * BLOCK_LEN
+        self.lo = self.hi = start
+        self.next = self.prior = None
+    def __len__(self):
+        """
+        Counts the elements in the block
+        :return: number of elements
+        """
+        return self.hi - self.lo
+class BlockDeque:
+    """
+    A double-ended queue with the same interface as Deque, storing its
+    elements in a doubly linked list of blocks of BLOCK_LEN slots instead of
+    one Node each. Pushes only allocate when an end block fills up, and
+    iteration reads whole blocks at a time
+    """
+    def __init__(self):
+        """
+        Initializes an empty BlockDeque
+        """
+        # an empty deque is one empty block, centred so it can grow both ways
+        self.front = self.back = Block()
+        self.size = 0
+        # an emptied end block is kept for the next one needed, so pushing
+        # and popping across a block boundary doesn't allocate every time
+        self.spare = None
+    def __len__(self):
+        """
+        Computes the number of elements in the BlockDeque
+        :return: The size of the BlockDeque
+        """
+        return self.size
+    def newBlock(self, start):
+        """
+        Gets an empty block, reusing the spare one if there is one
+        :param start: index the first element pushed goes next to
+        :return: the block
+        """
+        block = self.spare
+        if block is None:
+            return Block(start)
+        self.spare = None
+        block.lo = block.hi = start
+        block.next = block.prior = None
+        return block
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        if self.size == 0:
+            raise IndexError()
+        return self.front.data[self.front.lo]
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        if self.size == 0:
+            raise IndexError()
+        return self.back.data[self.back.hi - 1]
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the BlockDeque
+        :param e: An element to insert
+        """
+        block = self.front
+        # a full front block gets a new block in front of it
+        if block.lo == 0:
+            block = self.newBlock(BLOCK_LEN)
+            block.prior = self.front
+            self.front.next = block
+            self.front = block
+        block.lo -= 1
+        block.data[block.lo] = e
+        self.size += 1
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the BlockDeque
+        :param e: An element to insert
+        """
+        block = self.back
+        # a full back block gets a new block behind it
+        if block.hi == BLOCK_LEN:
+            block = self.newBlock(0)
+            block.next = self.back
+            self.back.prior = block
+            self.back = block
+        block.data[block.hi] = e
+        block.hi += 1
+        self.size += 1
+    def pop_front(self):
+        """
+        Removes and returns the first element
+        :return: The (former) first element
+        """
+        if self.size == 0:
+            raise IndexError()
+        block = self.front
+        e = block.data[block.lo]
+        # clear the slot so the block doesn't keep the element alive
+        block.data[block.lo] = None
+        block.lo += 1
+        self.size -= 1
+        if block.lo == block.hi:
+            self.dropFront()
+        return e
+    def pop_back(self):
+        """
+        Removes and returns the last element
+        :return: The (former) last element
+        """
+        if self.size == 0:
+            raise IndexError()
+        block = self.back
+        block.hi -= 1
+        e = block.data[block.hi]
+        block.data[block.hi] = None
+        self.size -= 1
+        if block.lo == block.hi:
+            self.dropBack()
+        return e
+    def dropFront(self):
+        """
+        Unlinks the emptied front block, or recentres it if it's the only one
+        """
+        block = self.front
+        if block is self.back:
+            block.lo = block.hi = BLOCK_LEN // 2
+            return
+        self.front = block.prior
+        self.front.next = None
+        self.spare = block
+    def dropBack(self):
+        """
+        Unlinks the emptied back block, or recentres it if it's the only one
+        """
+        block = self.back
+        if block is self.front:
+            block.lo = block.hi = BLOCK_LEN // 2
+            return
+        self.back = block.next
+        self.back.prior = None
+        self.spare = block
+    def clear(self):
+        """
+        Removes all elements from the BlockDeque
+        """
+        self.front = self.back = Block()
+        self.size = 0
+        self.spare = None
+    def blocks(self):
+        """
+        Iterates over the blocks from front to back
+        """
+        block = self.front
+        while block is not None:
+            yield block
+            block = block.prior
+    def __iter__(self):
+        """
+        Iterates over this BlockDeque from front to back
+        :return: An iterator
+        """
+        for block in self.blocks():
+            yield from islice(block.data, block.lo, block.hi)
+    def extend(self, other):
+        """
+        Adds each element of an iterable to the back of self
+        :param other: A Deque, BlockDeque or other iterable
+        """
+        if other is self:
+            other = list(other)
+        for item in other:
+            self.push_back(item)
+    def splice(self, other):
+        """
+        Moves every element of another BlockDeque to the back of self in
+        O(1), by linking its blocks on. other is left empty
+        :param other: A BlockDeque, or another deque whose elements are copied
+        """
+        if other is self:
+            raise ValueError('cannot splice a deque onto itself')
+        if not isinstance(other, BlockDeque):
+            self.extend(other)
+            other.clear()
+            return
+        if other.size == 0:
+            return
+        if self.size == 0:
+            self.front = other.front
+        else:
+            # blocks keep their own lo and hi, so partly filled ones can sit
+            # in the middle
+            self.back.prior = other.front
+            other.front.next = self.back
+        self.back = other.back
+        self.size += other.size
+        other.clear()
+    def split_at(self, index):
+        """
+        Cuts the BlockDeque in two, keeping the elements before index. Finding
+        the block hops from the nearer end, and at most one block is copied
+        :param index: position of the first element to move out, from 0 to
+        len(self)
+        :return: a new BlockDeque of the elements from index on
+        """
+        if not 0 <= index <= self.size:
+            raise IndexError(index)
+        tail = BlockDeque()
+        if index == self.size:
+            return tail
+        if index == 0:
+            tail.front, tail.back, tail.size = self.front, self.back, self.size
+            self.clear()
+            return tail
+        block, i = self.locate(index)
+        if i > block.lo:
+            # the block is shared, so its back part moves to a block of its own
+            count = block.hi - i
+            moved = Block(0)
+            moved.data[:count] = block.data[i:block.hi]
+            moved.hi = count
+            block.data[i:block.hi] = [None] * count
+            block.hi = i
+            moved.prior = block.prior
+            if moved.prior is not None:
+                moved.prior.next = moved
+            if block is self.back:
+                self.back = moved
+            block.prior = moved
+            moved.next = block
+            block = moved
+        tail.front = block
+        tail.back = self.back
+        tail.size = self.size - index
+        self.back = block.next
+        self.back.prior = None
+        block.next = None
+        self.size = index
+        return tail
+    def locate(self, index):
+        """
+        Finds the slot of an element, hopping whole blocks from whichever end
+        is nearer
+        :param index: position of the element, from 0 to len(self) - 1
+        :return: (block, index in the block's data)
+        """
+        if index < self.size // 2:
+            block = self.front
+            while index >= block.hi - block.lo:
+                index -= block.hi - block.lo
+                block = block.prior
+            return block, block.lo + index
+        # count from the back instead
+        index = self.size - 1 - index
+        block = self.back
+        while index >= block.hi - block.lo:
+            index -= block.hi - block.lo
+            block = block.next
+        return block, block.hi - 1 - index
+    def __getitem__(self, index):
+        """
+        Gets the element at a position in O(1 + distance from the nearer end /
+        BLOCK_LEN)
+        :param index: position of the element, negative ones counting from the
+        back
+        :return: the element
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        block, i = self.locate(index)
+        return block.data[i]
+    def rotate(self, n=1):
+        """
+        Rotates the BlockDeque n steps to the right, moving the last n elements
+        to the front, or to the left if n is negative. Elements are moved the
+        shorter way round
+        :param n: number of steps
+        """
+        if self.size == 0:
+            return
+        n %= self.size
+        if n <= self.size // 2:
+            for _ in range(n):
+                self.push_front(self.pop_back())
+        else:
+            for _ in range(self.size - n):
+                self.push_back(self.pop_front())
+    def unlink(self, block):
+        """
+        Takes an emptied block out of the list of blocks
+        :param block: the block
+        """
+        if block is self.front:
+            self.dropFront()
+        elif block is self.back:
+            self.dropBack()
+        else:
+            block.next.prior = block.prior
+            block.prior.next = block.next
+    def drop_between(self, start, end):
+        """
+        Deletes elements from the BlockDeque that within the range [start, end)
+        in O(1 + distance from the nearer end / BLOCK_LEN + BLOCK_LEN). Blocks
+        wholly inside the range are unlinked together without being visited
+        :param start: indicates the first position of the range
+        :param end: indicates the last position of the range(does not drop this element)
+        """
+        if start < 0 or end > self.size or start > end:
+            raise IndexError()
+        if start == end:
+            return
+        first, i = self.locate(start)
+        last, j = self.locate(end - 1)
+        self.size -= end - start
+        if first is last:
+            # close the gap from whichever side has fewer elements to move
+            count = j + 1 - i
+            data = first.data
+            if i - first.lo <= first.hi - j - 1:
+                data[first.lo + count:j + 1] = data[first.lo:i]
+                data[first.lo:first.lo + count] = [None] * count
+                first.lo += count
+            else:
+                data[i:first.hi - count] = data[j + 1:first.hi]
+                data[first.hi - count:first.hi] = [None] * count
+                first.hi -= count
+            if first.lo == first.hi:
+                self.unlink(first)
+            return
+        # cut the range out of the two end blocks and link them together
+        first.data[i:first.hi] = [None] * (first.hi - i)
+        first.hi = i
+        last.data[last.lo:j + 1] = [None] * (j + 1 - last.lo)
+        last.lo = j + 1
+        first.prior = last
+        last.next = first
+        if first.lo == first.hi:
+            self.unlink(first)
+        if last.lo == last.hi:
+            self.unlink(last)
+    def count_if(self, criteria):
+        """
+        counts how many elements of the BlockDeque satisfy the criteria
+        :param criteria: a bool function that takes an element of the BlockDeque
+        and returns true if that element matches the criteria and false otherwise
+        """
+        return sum(1 for item in self if criteria(item))
+    def is_empty(self):
+        """
+        Checks if the BlockDeque is empty
+        :return: True if the BlockDeque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this BlockDeque
+        :return: A string
+        """
+        return 'BlockDeque([{0}])'.format(','.join(str(item) for item in self))
+class RingDeque:
+    """
+    A bounded double-ended queue in a ring buffer of maxlen slots allocated up
+    front. Pushing onto a full RingDeque evicts the element at the opposite
+    end, so it works as a sliding window over the latest elements. The sum,
+    min, max and count_if of the window are kept up to date as elements come
+    and go, in O(1) amortized per element
+    """
+    def __init__(self, maxlen, track=()):
+        """
+        Initializes an empty RingDeque
+        :param maxlen: the most elements it holds
+        :param track: criteria functions whose count_if is kept up to date
+        """
+        if maxlen < 1:
+            raise ValueError('maxlen must be positive')
+        self.maxlen = maxlen
+        self.data = [None] * maxlen
+        # slot of the front element
+        self.head = 0
+        self.size = 0
+        # number of elements that match each tracked criteria
+        self.counts = dict.fromkeys(track, 0)
+        # the running sum, and monotonic queues of (number, element) whose
+        # fronts are the min and max. Each one is started by the first call
+        # that needs it
+        self.total = None
+        self.mins = None
+        self.maxes = None
+        # number of pushes to the back. While the queues exist the element at
+        # position i was pushed as number pushed - size + i
+        self.pushed = 0
+    def __len__(self):
+        """
+        Computes the number of elements in the RingDeque
+        :return: The size of the RingDeque
+        """
+        return self.size
+    def is_full(self):
+        """
+        Checks if the next push will evict an element
+        :return: True if the RingDeque holds maxlen elements
+        """
+        return self.size == self.maxlen
+    def slot(self, index):
+        """
+        Finds the slot of the element at a position
+        :param index: position of the element
+        :return: index into data
+        """
+        return (self.head + index) % self.maxlen
+    def entered(self, e, back):
+        """
+        Counts an element joining the RingDeque in the tracked aggregates
+        :param e: the element
+        :param back: whether it was pushed to the back
+        """
+        for criteria in self.counts:
+            if criteria(e):
+                self.counts[criteria] += 1
+        if self.total is not None:
+            self.total += e
+        # the queues only follow elements pushed to the back
+        if not back:
+            self.mins = self.maxes = None
+            return
+        number = self.pushed
+        self.pushed += 1
+        # an element can't be the min while a smaller one behind it remains
+        if self.mins is not None:
+            while self.mins and self.mins.peek_back()[1] > e:
+                self.mins.pop_back()
+            self.mins.push_back((number, e))
+        if self.maxes is not None:
+            while self.maxes and self.maxes.peek_back()[1] < e:
+                self.maxes.pop_back()
+            self.maxes.push_back((number, e))
+    def left(self, e, front):
+        """
+        Takes an element leaving the RingDeque out of the tracked aggregates.
+        Called before the size changes
+        :param e: the element
+        :param front: whether it left from the front
+        """
+        for criteria in self.counts:
+            if criteria(e):
+                self.counts[criteria] -= 1
+        if self.total is not None:
+            self.total -= e
+        # the queues only follow elements leaving from the front
+        if not front:
+            self.mins = self.maxes = None
+            return
+        number = self.pushed - self.size
+        if self.mins is not None and self.mins.peek_front()[0] == number:
+            self.mins.pop_front()
+        if self.maxes is not None and self.maxes.peek_front()[0] == number:
+            self.maxes.pop_front()
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        if self.size == 0:
+            raise IndexError()
+        return self.data[self.head]
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        if self.size == 0:
+            raise IndexError()
+        return self.data[self.slot(self.size - 1)]
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the RingDeque, evicting the last
+        element if it's full
+        :param e: An element to insert
+        """
+        if self.size == self.maxlen:
+            self.pop_back()
+        self.head = (self.head - 1) % self.maxlen
+        self.data[self.head] = e
+        self.size += 1
+        self.entered(e, False)
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the RingDeque, evicting the first
+        element if it's full
+        :param e: An element to insert
+        """
+        if self.size == self.maxlen:
+            self.pop_front()
+        self.data[self.slot(self.size)] = e
+        self.size += 1
+        self.entered(e, True)
+    def pop_front(self):
+        """
+        Removes and returns the first element
+        :return: The (former) first element
+        """
+        if self.size == 0:
+            raise IndexError()
+        e = self.data[self.head]
+        self.left(e, True)
+        # clear the slot so the ring doesn't keep the element alive
+        self.data[self.head] = None
+        self.head = (self.head + 1) % self.maxlen
+        self.size -= 1
+        return e
+    def pop_back(self):
+        """
+        Removes and returns the last element
+        :return: The (former) last element
+        """
+        if self.size == 0:
+            raise IndexError()
+        i = self.slot(self.size - 1)
+        e = self.data[i]
+        self.left(e, False)
+        self.data[i] = None
+        self.size -= 1
+        return e
+    def clear(self):
+        """
+        Removes all elements from the RingDeque
+        """
+        self.data = [None] * self.maxlen
+        self.head = 0
+        self.size = 0
+        self.counts = dict.fromkeys(self.counts, 0)
+        self.total = None
+        self.mins = self.maxes = None
+    def __iter__(self):
+        """
+        Iterates over this RingDeque from front to back
+        :return: An iterator
+        """
+        # the elements are data[head:] and then any that wrapped round
+        end = self.head + self.size
+        yield from islice(self.data, self.head, min(end, self.maxlen))
+        if end > self.maxlen:
+            yield from islice(self.data, end - self.maxlen)
+    def __getitem__(self, index):
+        """
+        Gets the element at a position in O(1)
+        :param index: position of the element, negative ones counting from the
+        back
+        :return: the element
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return self.data[self.slot(index)]
+    def rotate(self, n=1):
+        """
+        Rotates the RingDeque n steps to the right, moving the last n elements
+        to the front, or to the left if n is negative. A full ring only moves
+        its head
+        :param n: number of steps
+        """
+        if self.size == 0:
+            return
+        n %= self.size
+        if n == 0:
+            return
+        # the order changes, so the queues can't follow it
+        self.mins = self.maxes = None
+        if self.size == self.maxlen:
+            self.head = (self.head - n) % self.maxlen
+            return
+        items = list(self)
+        for i, e in enumerate(items[-n:] + items[:-n]):
+            self.data[self.slot(i)] = e
+    def extend(self, other):
+        """
+        Adds each element of an iterable to the back of self, evicting from the
+        front as needed
+        :param other: any iterable
+        """
+        if other is self:
+            other = list(other)
+        for item in other:
+            self.push_back(item)
+    def drop_between(self, start, end):
+        """
+        Deletes elements from the RingDeque that within the range [start, end)
+        by moving the elements behind the range forward
+        :param start: indicates the first position of the range
+        :param end: indicates the last position of the range(does not drop this element)
+        """
+        if start < 0 or end > self.size or start > end:
+            raise IndexError()
+        if start == end:
+            return
+        for i in range(start, end):
+            self.left(self.data[self.slot(i)], False)
+        count = end - start
+        for i in range(end, self.size):
+            self.data[self.slot(i - count)] = self.data[self.slot(i)]
+        for i in range(self.size - count, self.size):
+            self.data[self.slot(i)] = None
+        self.size -= count
+    def count_if(self, criteria):
+        """
+        counts how many elements of the RingDeque satisfy the criteria, in O(1)
+        for criteria given to track
+        :param criteria: a bool function that takes an element of the RingDeque
+        and returns true if that element matches the criteria and false otherwise
+        """
+        if criteria in self.counts:
+            return self.counts[criteria]
+        return sum(1 for item in self if criteria(item))
+    def sum(self):
+        """
+        Adds up the elements, keeping the sum up to date from then on
+        :return: the sum, 0 if empty
+        """
+        if self.total is None:
+            self.total = sum(self)
+        return self.total
+    def min(self):
+        """
+        Finds the least element, in O(1) while only pushes to the back and pops
+        from the front happen. Other changes rebuild the queue on the next call
+        :return: the least element
+        """
+        if self.size == 0:
+            raise IndexError()
+        if self.mins is None:
+            self.mins = self.monotonic(lambda kept, e: kept > e)
+        return self.mins.peek_front()[1]
+    def max(self):
+        """
+        Finds the greatest element, in O(1) while only pushes to the back and
+        pops from the front happen. Other changes rebuild the queue on the next
+        call
+        :return: the greatest element
+        """
+        if self.size == 0:
+            raise IndexError()
+        if self.maxes is None:
+            self.maxes = self.monotonic(lambda kept, e: kept < e)
+        return self.maxes.peek_front()[1]
+    def monotonic(self, beaten):
+        """
+        Builds a monotonic queue of the elements
+        :param beaten: function telling whether a queued element can no longer
+        be the answer once a new element is behind it
+        :return: BlockDeque of (number, element), the answer at the front
+        """
+        queue = BlockDeque()
+        first = self.pushed - self.size
+        for i, e in enumerate(self):
+            while queue and beaten(queue.peek_back()[1], e):
+                queue.pop_back()
+            queue.push_back((first + i, e))
+        return queue
+    def is_empty(self):
+        """
+        Checks if the RingDeque is empty
+        :return: True if the RingDeque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this RingDeque
+        :return: A string
+        """
+        return 'RingDeque([{0}], maxlen={1})'.format(
+            ','.join(str(item) for item in self), self.maxlen)
+class ConcurrentDeque:
+    """
+    A BlockDeque shared between threads and asyncio tasks. Every operation
+    holds one lock, pops can wait for elements to arrive, and batches are
+    pushed or popped under a single acquisition. For work stealing, a worker
+    pushes and pops its own deque at the back while idle workers steal from
+    the front
+    """
+    def __init__(self):
+        """
+        Initializes an empty ConcurrentDeque
+        """
+        self.items = BlockDeque()
+        self.lock = threading.Lock()
+        # threads waiting in a pop wait on this
+        self.not_empty = threading.Condition(self.lock)
+        # futures of coroutines waiting in get
+        self.waiters = []
+    def __len__(self):
+        """
+        Computes the number of elements in the ConcurrentDeque
+        :return: The size of the ConcurrentDeque
+        """
+        return len(self.items)
+    def wake(self, count):
+        """
+        Wakes up to count threads and coroutines waiting for elements. Called
+        with the lock held
+        :param count: number of elements that arrived
+        """
+        self.not_empty.notify(count)
+        while count and self.waiters:
+            waiter = self.waiters.pop(0)
+            # the waiter's own loop has to resolve it
+            if not waiter.done():
+                waiter.get_loop().call_soon_threadsafe(resolve, waiter)
+                count -= 1
+    def peek_front(self):
+        """
+        Looks at, but does not remove, the first element
+        :return: The first element
+        """
+        with self.lock:
+            return self.items.peek_front()
+    def peek_back(self):
+        """
+        Looks at, but does not remove, the last element
+        :return: The last element
+        """
+        with self.lock:
+            return self.items.peek_back()
+    def push_front(self, e):
+        """
+        Inserts an element at the front of the ConcurrentDeque
+        :param e: An element to insert
+        """
+        with self.lock:
+            self.items.push_front(e)
+            self.wake(1)
+    def push_back(self, e):
+        """
+        Inserts an element at the back of the ConcurrentDeque
+        :param e: An element to insert
+        """
+        with self.lock:
+            self.items.push_back(e)
+            self.wake(1)
+    def extend(self, other):
+        """
+        Adds each element of an iterable to the back of self under one
+        acquisition of the lock
+        :param other: any iterable
+        """
+        batch = list(other)
+        with self.lock:
+            for item in batch:
+                self.items.push_back(item)
+            self.wake(len(batch))
+    def wait(self, block, timeout):
+        """
+        Waits for an element, with the lock held
+        :param block: whether to wait at all
+        :param timeout: the most seconds to wait, or None to wait forever
+        """
+        if block:
+            self.not_empty.wait_for(self.items.__len__, timeout)
+        # nothing arrived in time
+        if not self.items.size:
+            raise IndexError()
+    def pop_front(self, block=True, timeout=None):
+        """
+        Removes and returns the first element, waiting for one if it's empty
+        :param block: whether to wait if it's empty
+        :param timeout: the most seconds to wait, or None to wait forever
+        :return: The (former) first element
+        """
+        with self.lock:
+            self.wait(block, timeout)
+            return self.items.pop_front()
+    def pop_back(self, block=True, timeout=None):
+        """
+        Removes and returns the last element, waiting for one if it's empty
+        :param block: whether to wait if it's empty
+        :param timeout: the most seconds to wait, or None to wait forever
+        :return: The (former) last element
+        """
+        with self.lock:
+            self.wait(block, timeout)
+            return self.items.pop_back()
+    def pop_many(self, count, block=True, timeout=None, back=False):
+        """
+        Removes up to count elements under one acquisition of the lock,
+        waiting for at least one if it's empty
+        :param count: the most elements to remove
+        :param block: whether to wait if it's empty
+        :param timeout: the most seconds to wait, or None to wait forever
+        :param back: whether to take them from the back instead of the front
+        :return: list of the elements in the order they were removed
+        """
+        with self.lock:
+            self.wait(block, timeout)
+            pop = self.items.pop_back if back else self.items.pop_front
+            return [pop() for _ in range(min(count, self.items.size))]
+    def steal(self, count=None):
+        """
+        Takes elements from the front without waiting, for an idle worker
+        taking work from another's deque
+        :param count: the most elements to take, half of them by default
+        :return: list of the elements taken, empty if there were none
+        """
+        with self.lock:
+            if count is None:
+                count = (self.items.size + 1) // 2
+            count = min(count, self.items.size)
+            return [self.items.pop_front() for _ in range(count)]
+    async def get(self, back=False):
+        """
+        Removes and returns an element, letting the event loop run while
+        waiting for one if it's empty
+        :param back: whether to take it from the back instead of the front
+        :return: the element
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            with self.lock:
+                if self.items.size:
+                    if back:
+                        return self.items.pop_back()
+                    return self.items.pop_front()
+                waiter = loop.create_future()
+                self.waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self.lock:
+                    if waiter in self.waiters:
+                        self.waiters.remove(waiter)
+                    # a wake-up meant for this coroutine goes to another
+                    elif self.items.size:
+                        self.wake(1)
+                raise
+    def clear(self):
+        """
+        Removes all elements from the ConcurrentDeque
+        """
+        with self.lock:
+            self.items.clear()
+    def __iter__(self):
+        """
+        Iterates over a copy of this ConcurrentDeque from front to back, taken
+        under the lock
+        :return: An iterator
+        """
+        with self.lock:
+            return iter(list(self.items))
+    def is_empty(self):
+        """
+        Checks if the ConcurrentDeque is empty
+        :return: True if the ConcurrentDeque contains no elements, False otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        A string representation of this ConcurrentDeque
+        :return: A string
+        """
+        return 'ConcurrentDeque([{0}])'.format(
+            ','.join(str(item) for item in self))
+def resolve(waiter):
+    """
+    Wakes a coroutine waiting in ConcurrentDeque.get, unless it already gave up
+    :param waiter: the future it's waiting on
+    """
+    if not waiter.done():
+        waiter.set_result(None)
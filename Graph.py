@@ -19,6 +19,7 @@ class Vertex:
     A vertex within the graph. Stores connections  and edgeswith a dictionary
     object
     """
+    __slots__ = ('name', 'connections')
     def __init__(self, k=0):
         """
         Constructor
@@ -3,34 +3,253 @@
 ######################
 """
 Defines all necessary classes and functions for the implementation of
-a Hash Map data structure. Uses double hashing to resolve collisions insertions
+a Hash Map data structure. Uses double hashing to resolve collisions insertions.
+Storage is laid out like CPython's dict: a small array of integer slots that
+point into dense, insertion-ordered lists of hashes, keys and values.
 """
+import hashlib
+import mmap
+import struct
+import sys
+import threading
+import time
+from array import array
+from itertools import islice
+from operator import length_hint
+# values stored in index slots that don't point at an entry
+EMPTY = -1
+DUMMY = -2
+# marks a dense entry whose pair was deleted
+DELETED = object()
+# least number of old entries moved into the new table on each map operation
+# while an incremental rehash is in progress
+REHASH_STEPS = 8
+class IndexTable:
+    """
+    One generation of a HashMap's storage. The index array holds positions
+    into the dense hashes, keys and values lists, EMPTY for a slot that was
+    never used, or DUMMY for a slot whose entry was deleted.
+    """
+    def __init__(self, size):
+        """
+        Constructor
+        :param size: number of slots in the index array
+        """
+        self.size = size
+        self.indices = index_array(size)
+        self.hashes = array('q')
+        self.keys = []
+        self.values = []
+    def lookup(self, key, val, start=0):
+        """
+        Finds a key in the table
+        :param key: The key we're looking for
+        :param val: The hash value for the key
+        :param start: entries at positions below this are ignored
+        :return: (slot, position) of the key, or (-1, -1) if it isn't there
+        """
+        indices = self.indices
+        hashes = self.hashes
+        keys = self.keys
+        i = 0
+        slot = val % self.size
+        pos = indices[slot]
+        # an EMPTY slot ends the probe sequence; DUMMY is below start
+        while pos != EMPTY:
+            # compare cached hashes first so most mismatches skip __eq__
+            if pos >= start and hashes[pos] == val:
+                if keys[pos] is key or keys[pos] == key:
+                    return slot, pos
+            i += 1
+            slot = hash_index(val, i, self.size)
+            pos = indices[slot]
+        return -1, -1
+    def append(self, key, val, value):
+        """
+        Adds a pair after every other entry and points a slot at it. The key
+        must not already be in the table
+        :param key: key for the pair
+        :param val: The hash value for the key
+        :param value: value associated with key
+        """
+        pos = len(self.keys)
+        self.hashes.append(val)
+        self.keys.append(key)
+        self.values.append(value)
+        i = 0
+        slot = val % self.size
+        # deleted slots can be reused since the key isn't in the table
+        while self.indices[slot] >= 0:
+            i += 1
+            slot = hash_index(val, i, self.size)
+        self.indices[slot] = pos
+    def remove(self, slot, pos):
+        """
+        Deletes the entry a slot points at
+        :param slot: index slot of the entry
+        :param pos: position of the entry in the dense lists
+        """
+        self.indices[slot] = DUMMY
+        self.keys[pos] = DELETED
+        self.values[pos] = None
+class InstrumentedTable(IndexTable):
+    """
+    An IndexTable that records how many slots each lookup and insert probes.
+    HashMap only swaps its tables for these while stats are enabled, so plain
+    tables pay nothing for instrumentation
+    """
+    def __init__(self, size, stats):
+        """
+        Constructor
+        :param size: number of slots in the index array
+        :param stats: the MapStats to record into
+        """
+        IndexTable.__init__(self, size)
+        self.stats = stats
+    def lookup(self, key, val, start=0):
+        """
+        Finds a key in the table, recording the number of slots probed
+        :param key: The key we're looking for
+        :param val: The hash value for the key
+        :param start: entries at positions below this are ignored
+        :return: (slot, position) of the key, or (-1, -1) if it isn't there
+        """
+        indices = self.indices
+        hashes = self.hashes
+        keys = self.keys
+        i = 0
+        slot = val % self.size
+        pos = indices[slot]
+        # an EMPTY slot ends the probe sequence; DUMMY is below start
+        while pos != EMPTY:
+            if pos >= start and hashes[pos] == val:
+                if keys[pos] is key or keys[pos] == key:
+                    record(self.stats.lookups, i + 1)
+                    return slot, pos
+            i += 1
+            slot = hash_index(val, i, self.size)
+            pos = indices[slot]
+        record(self.stats.lookups, i + 1)
+        return -1, -1
+    def append(self, key, val, value):
+        """
+        Adds a pair after every other entry and points a slot at it,
+        recording the number of slots probed
+        :param key: key for the pair
+        :param val: The hash value for the key
+        :param value: value associated with key
+        """
+        pos = len(self.keys)
+        self.hashes.append(val)
+        self.keys.append(key)
+        self.values.append(value)
+        i = 0
+        slot = val % self.size
+        while self.indices[slot] >= 0:
+            i += 1
+            slot = hash_index(val, i, self.size)
+        self.indices[slot] = pos
+        record(self.stats.inserts, i + 1)
+class MapStats:
+    """
+    Counters collected by a HashMap while its stats are enabled
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        # histograms: index n counts the operations that probed n slots
+        self.lookups = []
+        self.inserts = []
+        self.resizes = 0
+        self.rehash_seconds = 0.0
 class HashMap:
     """
     A open-addressed hashmap for effectively storing key-value pairs. Resolves
-    collision conflicts with double hashing.
+    collision conflicts with double hashing and iterates in insertion order.
+    Resizing is incremental: the old table is kept around and drained a few
+    entries per operation, so no single insert pays for rehashing the whole
+    map. Entries are drained faster the less room the old table has left.
+
+    >>> m = HashMap(.95)
+    >>> for i in range(100000):
+    ...     m[i] = i
+    >>> len(m), -1 in m
+    (100000, False)
     """
-    def __init__(self, load_factor=.5):
+    def __init__(self, load_factor=.5, capacity=0):
         """
         Constructor
         :param load_factor: The maximum load factor that a hashmap can
         have before rehashing occurs
+        :param capacity: number of pairs the map should be able to hold
+        before its first rehash
         """
         # You may change the default maximum load factor
         self.max_load_factor = load_factor
         # Other initialization code can go here
-        self.size = 10
+        self.size = capacity_for(capacity, load_factor)
         self.items = 0
-        self.hmbuckets = [None] * self.size
-        self.keysset = set()
-    def hash1(self, val):
+        self.table = IndexTable(self.size)
+        # table still being drained by an incremental rehash, and the
+        # position of the next old entry to move
+        self.oldtable = None
+        self.rehashidx = 0
+        # old entries moved per operation by the rehash in progress
+        self.rehashrate = REHASH_STEPS
+        # MapStats while instrumentation is enabled
+        self.instruments = None
+    @classmethod
+    def from_pairs(cls, pairs, load_factor=.5):
+        """
+        Builds a hashmap sized up front for a collection of pairs
+        :param pairs: a mapping, HashMap or iterable of (key, value) pairs
+        :param load_factor: The maximum load factor of the new hashmap
+        :return: a HashMap holding the pairs
+        """
+        new_map = cls(load_factor, length_hint(pairs))
+        new_map.update(pairs)
+        return new_map
+    @classmethod
+    def count_by(cls, iterable, key=None):
+        """
+        Counts how many items of an iterable share each key
+        :param iterable: the items to count
+        :param key: function giving the key of an item, defaults to the item
+        itself
+        :return: a HashMap of each key and the number of items with that key
+
+        >>> import numpy
+        >>> counts = HashMap.count_by(numpy.arange(-128, 128, dtype=numpy.int8))
+        >>> len(counts), counts[-128], counts[127]
+        (256, 1, 1)
+        """
+        # integer arrays are counted by numpy without a python-level loop.
+        # numpy is never imported here: a caller passing an array already has
+        numpy = sys.modules.get('numpy')
+        if key is None and numpy is not None and \
+                isinstance(iterable, numpy.ndarray) and \
+                iterable.dtype.kind in 'iu':
+            return count_array(iterable)
+        counts = cls()
+        if key is None:
+            for item in iterable:
+                counts.increment(item)
+        else:
+            for item in iterable:
+                counts.increment(key(item))
+        return counts
+    def hash1(self, val, size=None):
         """
         Calculates the first index to look in the hashmap to insert/find a pair.
         :param val: The hash value for the key object
+        :param size: capacity of the index array, defaults to the map's
         :return: an index in the hashmap
         """
-        return val % self.size
-    def hashIndex(self, val, i):
+        if size is None:
+            size = self.size
+        return val % size
+    def hashIndex(self, val, i, size=None):
         """
         Calculates a semi-random index in the hashmap to be checked for open
         addressing.
@@ -38,8 +257,11 @@ class HashMap:
         :param i: A secondary value passed in to choose the number to be
         multiplied by the second hash function to ensure variety in the hash
         index calculated
+        :param size: capacity of the index array, defaults to the map's
         """
-        return (self.hash1(val) + (i*(hash2(val, i)))) % self.size
+        if size is None:
+            size = self.size
+        return hash_index(val, i, size)
     def __len__(self):
         """
         Returns how many items are in the hashmap
@@ -64,7 +286,24 @@ class HashMap:
         :param key: Key we're checking for in hashmap
         :return: boolean, whether key was found or not
         """
-        return key in self.keysset
+        return self.findEntry(key, hash(key))[0] is not None
+    def findEntry(self, key, val):
+        """
+        Finds the entry for a key in either table
+        :param key: The key we're looking for
+        :param val: The hash value for the key
+        :return: (table, slot, position) of the key, or (None, -1, -1) if the
+        key isn't in the hashmap
+        """
+        slot, pos = self.table.lookup(key, val)
+        if pos >= 0:
+            return self.table, slot, pos
+        # entries not moved yet by an incremental rehash are in the old table
+        if self.oldtable is not None:
+            slot, pos = self.oldtable.lookup(key, val, self.rehashidx)
+            if pos >= 0:
+                return self.oldtable, slot, pos
+        return None, -1, -1
     def __getitem__(self, key):
         """
         Gets a the value associated with a key in the hashmap. If key is not in
@@ -72,22 +311,13 @@ class HashMap:
         :param key: The key we're looking for in the hashmap
         :return: The value of the key in the hashmap.
         """
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        table, slot, pos = self.findEntry(key, hash(key))
         # if key isn't in map, raise error
-        if key not in self:
+        if table is None:
             raise KeyError(key)
-        else:
-            # set i value for double hashing to 0
-            i = 0
-            # keep looping until item is found
-            while True:
-                # find index to check for key in hashmap
-                index = self.hashIndex(hash(key), i)
-                # if that index doesn't have the key, add 1 to 1 and loop
-                if self.hmbuckets[index] is None or self.hmbuckets[index][0] != key:
-                    i += 1
-                # if the keys match, return value associated with key
-                else:
-                    return self.hmbuckets[index][1]
+        return table.values[pos]
 
     def __setitem__(self, key, value):
         """
@@ -96,124 +326,303 @@ class HashMap:
         :param key: key for the pair
         :param value: value associated with key
         """
-        # find initial index for insertion
-        index = self.hashIndex(hash(key), 0)
-        inserted = False
-        # intialize i for subsequent calls to hashIndex
-        i = 1
-        # Until something is inserted
-        while not inserted:
-            # if hashmap and index is empty
-            if self.hmbuckets[index] is None:
-                # set the key, value pair to be at that index
-                self.hmbuckets[index] = [key, value]
-                self.keysset.add(key)
-                # stop looping, and add 1 to # of items
-                inserted = True
-                self.items += 1
-            # if key is already in hashmap
-            elif self.hmbuckets[index][0] == key:
-                # update value, stop looping
-                self.hmbuckets[index][1] = value
-                inserted = True
-            # if there's a key at that index but not the right key
-            else:
-                # find the next hash index, update i
-                index = self.hashIndex(hash(key), i)
-                i += 1
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        val = hash(key)
+        table, slot, pos = self.findEntry(key, val)
+        # if key is already in hashmap, update value
+        if table is not None:
+            table.values[pos] = value
+            return
+        self.insertNew(key, val, value)
+    def upsert(self, key, update, default):
+        """
+        Updates the value of a key with a single lookup, inserting default if
+        the key isn't in the hashmap yet
+        :param key: key for the pair
+        :param update: function taking the current value and giving the new one
+        :param default: value set if the key isn't in the hashmap
+        :return: the key's new value
+        """
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        val = hash(key)
+        table, slot, pos = self.findEntry(key, val)
+        if table is None:
+            self.insertNew(key, val, default)
+            return default
+        table.values[pos] = update(table.values[pos])
+        return table.values[pos]
+    def increment(self, key, amount=1):
+        """
+        Adds to the value of a key with a single lookup, starting from 0 if
+        the key isn't in the hashmap yet
+        :param key: key for the pair
+        :param amount: how much to add
+        :return: the key's new value
+        """
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        val = hash(key)
+        table, slot, pos = self.findEntry(key, val)
+        if table is None:
+            self.insertNew(key, val, amount)
+            return amount
+        table.values[pos] += amount
+        return table.values[pos]
+    def insertNew(self, key, val, value):
+        """
+        Adds a pair whose key isn't in the hashmap, rehashing if needed
+        :param key: key for the pair
+        :param val: The hash value for the key
+        :param value: value associated with key
+        """
+        self.items += 1
+        # while a rehash is in progress new pairs go after the old table's
+        # entries so that they are moved over in insertion order. The rehash
+        # rate makes sure the old table is drained before it runs out of room
+        if self.oldtable is not None:
+            self.oldtable.append(key, val, value)
+            return
+        self.table.append(key, val, value)
         # rehash
         self.resizeMap()
     def resizeMap(self, shrinking=False):
         """
-        Rehashes map to stay under maximum load factor and over minimum load
-        factor
+        Starts an incremental rehash to stay under maximum load factor and over
+        minimum load factor. The current table becomes the old table, which
+        rehashStep then drains into a fresh one
         :param shrinking: boolean, whether or not we're shrinking the capacity
         of the hashmap
         """
-        # create new hash map
-        new_map = HashMap()
-        # if we need to grow or shrink
-        if self.load() >= self.max_load_factor or shrinking:
-            # if it's shrinking we're doing
-            if shrinking:
-                # new map will be half the size
-                new_map.size = self.size // 2
-            else:
-                # if growing, new map will be double size
-                new_map.size = self.size * 2
-            new_map.hmbuckets = [None] * new_map.size
-            # add all pairs from old map into new map
-            for pair in self:
-                new_map[pair[0]] = pair[1]
-                new_map.keysset.add(pair[0])
-            # update size and buckets to new map's size and buckets
-            self.size = new_map.size
-            self.hmbuckets = new_map.hmbuckets
+        # a rehash is already under way; checked again once it is done
+        if self.oldtable is not None:
+            return
+        # if it's shrinking we're doing, new map will be half the size
+        if shrinking:
+            new_size = self.size // 2
+        # if growing, new map will be double size. Probes stop at an EMPTY
+        # slot, so the map also grows before the next pair could take the
+        # last one, whatever the load factor
+        elif self.load() >= self.max_load_factor or \
+                self.items + 1 >= self.size:
+            new_size = self.size * 2
+        # too many deleted entries, clean them out without growing. Every
+        # entry uses up a slot, so this also keeps positions within the index
+        elif float(len(self.table.keys))/self.size >= self.max_load_factor or \
+                len(self.table.keys) + 1 >= self.size:
+            new_size = self.size
+        else:
+            return
+        if self.instruments is not None:
+            self.instruments.resizes += 1
+        # keep the current table around to be drained
+        self.oldtable = self.table
+        self.rehashidx = 0
+        # pairs inserted during the rehash are appended to the old table, so
+        # drain it fast enough to finish before it takes its last EMPTY slot
+        entries = len(self.oldtable.keys)
+        room = self.oldtable.size - 1 - entries
+        if room > 0:
+            self.rehashrate = max(REHASH_STEPS, -(-entries // room) + 1)
+        else:
+            self.rehashrate = entries
+        # update size and table to the new map's
+        self.size = new_size
+        self.table = self.newTable(new_size)
+    def reserve(self, count):
+        """
+        Grows the hashmap in a single rehash so that it can hold count pairs
+        without rehashing again
+        :param count: number of pairs the map should be able to hold
+        """
+        # finish any rehash in progress so there is only one table to grow
+        if self.oldtable is not None:
+            self.rehashStep(len(self.oldtable.keys))
+        new_size = capacity_for(count, self.max_load_factor)
+        if new_size <= self.size:
+            return
+        if self.instruments is not None:
+            self.instruments.resizes += 1
+        # move every entry over right away instead of a few per operation
+        self.oldtable = self.table
+        self.rehashidx = 0
+        self.size = new_size
+        self.table = self.newTable(new_size)
+        self.rehashStep(len(self.oldtable.keys))
+    def rehashStep(self, steps=None):
+        """
+        Moves entries from the old table into the current one in insertion
+        order, reusing their cached hashes and skipping deleted entries. Does
+        nothing if no rehash is in progress
+        :param steps: number of old entries to move, defaults to the rate set
+        when the rehash started
+        """
+        old = self.oldtable
+        if old is None:
+            return
+        if steps is None:
+            steps = self.rehashrate
+        if self.instruments is not None:
+            started = time.perf_counter()
+        end = min(self.rehashidx + steps, len(old.keys))
+        for pos in range(self.rehashidx, end):
+            if old.keys[pos] is not DELETED:
+                self.table.append(old.keys[pos], old.hashes[pos],
+                                  old.values[pos])
+        self.rehashidx = end
+        # once every old entry is moved, drop the old table
+        if end == len(old.keys):
+            self.oldtable = None
+            self.rehashidx = 0
+        if self.instruments is not None:
+            self.instruments.rehash_seconds += time.perf_counter() - started
+    def newTable(self, size):
+        """
+        Makes an empty table, instrumented if stats are enabled
+        :param size: number of slots in the index array
+        :return: an IndexTable
+        """
+        if self.instruments is None:
+            return IndexTable(size)
+        return InstrumentedTable(size, self.instruments)
+    def enable_stats(self):
+        """
+        Starts recording probe lengths, resizes and time spent rehashing.
+        Resets the counters if stats were already enabled
+        """
+        self.instruments = MapStats()
+        self.table = retype(self.table, self.instruments)
+        if self.oldtable is not None:
+            self.oldtable = retype(self.oldtable, self.instruments)
+    def disable_stats(self):
+        """
+        Stops recording stats, so the map no longer pays for them
+        """
+        self.instruments = None
+        self.table = retype(self.table, None)
+        if self.oldtable is not None:
+            self.oldtable = retype(self.oldtable, None)
+    def stats(self):
+        """
+        Gets a snapshot of the map's stats and of how its index slots cluster
+        :return: dictionary of the probe length histograms for lookups and
+        inserts, the number of resizes, seconds spent rehashing, the load
+        factor, the fraction of slots in use or deleted, and the number, mean
+        length and longest length of runs of adjacent used slots
+        """
+        if self.instruments is None:
+            raise ValueError('stats are not enabled')
+        stats = self.instruments
+        # runs of adjacent slots that aren't EMPTY in the current index
+        runs = []
+        run = 0
+        for pos in self.table.indices:
+            if pos != EMPTY:
+                run += 1
+            elif run:
+                runs.append(run)
+                run = 0
+        if run:
+            runs.append(run)
+        return {'lookups': dict(histogram_items(stats.lookups)),
+                'inserts': dict(histogram_items(stats.inserts)),
+                'resizes': stats.resizes,
+                'rehash_seconds': stats.rehash_seconds,
+                'load': self.load(),
+                'fill': float(sum(runs))/self.size,
+                'clusters': len(runs),
+                'mean_cluster': float(sum(runs))/len(runs) if runs else 0.0,
+                'max_cluster': max(runs) if runs else 0}
 
     def __delitem__(self, key):
         """
         Deletes an item from the hashmap if that item is in there
         :param key: the key of the item we want to delete
         """
-        # find initial index of key in hashmap
-        index = self.hashIndex(hash(key), 0)
-        # initialize i for subsequent calls to hashIndex
-        i = 1
-        deleted = False
-        # if key exists in hashmap
-        if key in self:
-            # loop until we find the key
-            while not deleted:
-                # if there is nothing at the current index
-                if self.hmbuckets[index] is None:
-                    # update index and loop again
-                    index = self.hashIndex(hash(key), i)
-                    i += 1
-                # if we find the key
-                elif self.hmbuckets[index][0] == key:
-                    # set that index to None, items--, stop looping
-                    self.hmbuckets[index] = None
-                    self.keysset.remove(key)
-                    self.items -= 1
-                    deleted = True
-                # if the key at current index isn't the key we're looking for
-                else:
-                    # update index and loop again
-                    index = self.hashIndex(hash(key), i)
-                    i += 1
-            # after done deleting, if load factor is too low,
-            if self.size > 10 and self.load() <= .05:
-                # rehash
-                self.resizeMap(shrinking=True)
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        table, slot, pos = self.findEntry(key, hash(key))
         # if key doesn't exist in hashmap
-        else:
+        if table is None:
             raise KeyError(key)
+        # mark the slot DUMMY so probe sequences through it still work
+        table.remove(slot, pos)
+        self.items -= 1
+        # after done deleting, if load factor is too low,
+        if self.size > 10 and self.load() <= .05:
+            # rehash
+            self.resizeMap(shrinking=True)
+    def update(self, other):
+        """
+        Sets every pair from other in the hashmap, growing it once up front
+        when the number of pairs is known
+        :param other: a mapping, HashMap or iterable of (key, value) pairs
+        """
+        # HashMaps already iterate over their pairs
+        if isinstance(other, HashMap):
+            pairs = iter(other)
+        elif hasattr(other, 'items'):
+            pairs = other.items()
+        else:
+            pairs = other
+        self.reserve(self.items + length_hint(other))
+        for key, value in pairs:
+            self[key] = value
+    def set_many(self, keys, values):
+        """
+        Sets each key in keys to the matching value in values
+        :param keys: iterable of keys
+        :param values: iterable of values, in the same order as keys
+        """
+        self.reserve(self.items + min(length_hint(keys), length_hint(values)))
+        for key, value in zip(keys, values):
+            self[key] = value
+    def get_many(self, keys, default=None):
+        """
+        Gets the value associated with each of several keys
+        :param keys: iterable of keys to look up
+        :param default: value given for keys that aren't in the hashmap
+        :return: list of values, in the same order as keys
+        """
+        # move a few entries along if a rehash is in progress
+        self.rehashStep()
+        values = []
+        for key in keys:
+            table, slot, pos = self.findEntry(key, hash(key))
+            values.append(default if table is None else table.values[pos])
+        return values
     def __iter__(self):
         """
-        Iterates through the hashmap, yielding (key, value) pairs
+        Iterates through the hashmap in insertion order, yielding (key, value)
+        pairs
         """
-        # loop through numbers 0 to capacity of hashmap
-        for i in range(0, self.size):
-            # yield the pair at that index if pair exists
-            if self.hmbuckets[i]:
-                yield self.hmbuckets[i]
+        # entries already moved by an incremental rehash come first, followed
+        # by the ones still in the old table
+        tables = [(self.table, 0)]
+        if self.oldtable is not None:
+            tables.append((self.oldtable, self.rehashidx))
+        for table, start in tables:
+            entries = zip(table.keys, table.values)
+            for key, value in islice(entries, start, None):
+                if key is not DELETED:
+                    yield key, value
     def clear(self):
         """
         Clears the hashmap of all pairs
         """
-        # set all pairs in hashmap to None
-        for item in self:
-            item.clear()
         # reinitialize all member variables
         self.size = 10
         self.items = 0
-        self.keysset = set()
+        self.table = self.newTable(self.size)
+        self.oldtable = None
+        self.rehashidx = 0
     def keys(self):
         """
         Gets the set of keys within the hashmap
         :return: set of keys in hashmap
         """
-        return self.keysset
+        return set(key for key, value in self)
     # supplied methods
     def __repr__(self):
         """
@@ -236,6 +645,750 @@ class HashMap:
         return len(self) == 0
 
     # Helper functions can go here
+class ConcurrentHashMap:
+    """
+    A hashmap that can be shared between threads. Keys are split by hash
+    across segments, each one a HashMap with its own lock that resizes on its
+    own, so a write only blocks writes to the same segment. Reads take no lock
+    unless they overlap a write to their segment.
+    """
+    def __init__(self, load_factor=.5, capacity=0, segments=16):
+        """
+        Constructor
+        :param load_factor: The maximum load factor of each segment
+        :param capacity: number of pairs the map should be able to hold
+        before its first rehash
+        :param segments: number of segments, rounded up to a power of two
+        """
+        # top bits of a mixed hash pick the segment, so they don't line up
+        # with the low bits each segment uses to pick an index
+        self.bits = max(segments - 1, 0).bit_length()
+        count = 1 << self.bits
+        self.segments = [HashMap(load_factor, capacity // count)
+                         for _ in range(count)]
+        self.locks = [threading.Lock() for _ in range(count)]
+        # bumped before and after every write to a segment, so it is odd
+        # while a write is in progress
+        self.versions = [0] * count
+    def segmentIndex(self, val):
+        """
+        Finds which segment a hash value belongs to
+        :param val: The hash value for the key object
+        :return: index of the segment
+        """
+        return ((val * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> \
+            (64 - self.bits)
+    def lookup(self, key):
+        """
+        Finds the value of a key, retrying under the segment's lock if a write
+        to the segment overlapped the read
+        :param key: The key we're looking for
+        :return: (True, value) if the key was found, (False, None) if not
+        """
+        val = hash(key)
+        i = self.segmentIndex(val)
+        segment = self.segments[i]
+        version = self.versions[i]
+        # an even version means no write was in progress when we started
+        if version % 2 == 0:
+            try:
+                table, slot, pos = segment.findEntry(key, val)
+                found = (table is not None,
+                         None if table is None else table.values[pos])
+            # a write swapping tables under us can leave the read broken;
+            # the locked retry below re-raises anything that is a real error
+            except Exception:
+                found = None
+            if found is not None and self.versions[i] == version:
+                return found
+        with self.locks[i]:
+            table, slot, pos = segment.findEntry(key, val)
+            if table is None:
+                return False, None
+            return True, table.values[pos]
+    def __len__(self):
+        """
+        Returns how many items are in the hashmap
+        :return: number of items in the hashmap
+        """
+        return sum(len(segment) for segment in self.segments)
+    def __contains__(self, key):
+        """
+        Checks to see if the key is in the hashmap
+        :param key: Key we're checking for in hashmap
+        :return: boolean, whether key was found or not
+        """
+        return self.lookup(key)[0]
+    def __getitem__(self, key):
+        """
+        Gets the value associated with a key in the hashmap. If key is not in
+        hashmap, a KeyError is raised
+        :param key: The key we're looking for in the hashmap
+        :return: The value of the key in the hashmap.
+        """
+        found, value = self.lookup(key)
+        if not found:
+            raise KeyError(key)
+        return value
+    def get(self, key, default=None):
+        """
+        Gets the value associated with a key in the hashmap
+        :param key: The key we're looking for in the hashmap
+        :param default: value given if the key isn't in the hashmap
+        :return: The value of the key, or default
+        """
+        found, value = self.lookup(key)
+        return value if found else default
+    def __setitem__(self, key, value):
+        """
+        Sets a (key, value) pair in the hashmap. If key already exists in the
+        map, update the value associated with the key
+        :param key: key for the pair
+        :param value: value associated with key
+        """
+        i = self.segmentIndex(hash(key))
+        with self.locks[i]:
+            self.versions[i] += 1
+            try:
+                self.segments[i][key] = value
+            finally:
+                self.versions[i] += 1
+    def __delitem__(self, key):
+        """
+        Deletes an item from the hashmap if that item is in there
+        :param key: the key of the item we want to delete
+        """
+        i = self.segmentIndex(hash(key))
+        with self.locks[i]:
+            self.versions[i] += 1
+            try:
+                del self.segments[i][key]
+            finally:
+                self.versions[i] += 1
+    def update(self, other):
+        """
+        Sets every pair from other in the hashmap
+        :param other: a mapping, HashMap or iterable of (key, value) pairs
+        """
+        if isinstance(other, (HashMap, ConcurrentHashMap)):
+            pairs = iter(other)
+        elif hasattr(other, 'items'):
+            pairs = other.items()
+        else:
+            pairs = other
+        for key, value in pairs:
+            self[key] = value
+    def __iter__(self):
+        """
+        Iterates through the hashmap one segment at a time, yielding (key,
+        value) pairs. Each segment is copied under its lock, so the pairs from
+        one segment are consistent with each other
+        """
+        for i, segment in enumerate(self.segments):
+            with self.locks[i]:
+                pairs = list(segment)
+            yield from pairs
+    def keys(self):
+        """
+        Gets the set of keys within the hashmap
+        :return: set of keys in hashmap
+        """
+        return set(key for key, value in self)
+    def clear(self):
+        """
+        Clears the hashmap of all pairs
+        """
+        for i, segment in enumerate(self.segments):
+            with self.locks[i]:
+                self.versions[i] += 1
+                segment.clear()
+                self.versions[i] += 1
+    def __repr__(self):
+        """
+        A string representation of this map
+        :return: A string representing this map
+        """
+        return '{{{0}}}'.format(','.join('{0}:{1}'.format(k, v) for k, v in self))
+    def __bool__(self):
+        """
+        Checks if there are items in the map
+        :return True if the map is non-empty
+        """
+        return len(self) != 0
+class CacheEntry:
+    """
+    A cached (key, value) pair, linked into one of its cache's use lists
+    """
+    def __init__(self, key, value, size, expires):
+        """
+        Constructor
+        :param key: key for the pair
+        :param value: value associated with key
+        :param size: bytes charged to the cache's budget for the pair
+        :param expires: clock time the pair expires at, or None
+        """
+        self.key = key
+        self.value = value
+        self.size = size
+        self.expires = expires
+        # the UseList holding the entry and its neighbours there; prior is
+        # toward the front
+        self.bucket = None
+        self.next = self.prior = None
+class UseList:
+    """
+    A circular list of the cache entries used a given number of times, oldest
+    at the front. The list itself is the sentinel of its ring of entries, and
+    lists are chained to each other in order of increasing use count
+    """
+    def __init__(self, freq):
+        """
+        Constructor
+        :param freq: how many times the entries in this list were used
+        """
+        self.freq = freq
+        self.next = self.prior = self
+        self.higher = self.lower = self
+    def is_empty(self):
+        """
+        Checks if the list holds no entries
+        :return: True if there are no entries
+        """
+        return self.next is self
+class CacheMap:
+    """
+    A hashmap bounded by a number of pairs and/or a byte budget, for use as a
+    memoization table. When full it evicts by one of three policies in O(1):
+    'lru' evicts the least recently used pair, 'lfu' the least frequently used
+    (least recently used among ties) and 'ttl' the pair closest to expiring.
+    """
+    def __init__(self, max_items=None, max_bytes=None, policy='lru', ttl=None,
+                 sizeof=None, clock=time.monotonic):
+        """
+        Constructor
+        :param max_items: maximum number of pairs, or None for no limit
+        :param max_bytes: maximum total size of the pairs, or None for no limit
+        :param policy: 'lru', 'lfu' or 'ttl'
+        :param ttl: seconds a pair lives after it is set, or None to never
+        expire. Required by the 'ttl' policy
+        :param sizeof: function giving the size of a (key, value) pair,
+        defaults to the sum of sys.getsizeof of both
+        :param clock: function giving the current time in seconds
+        """
+        if policy not in ('lru', 'lfu', 'ttl'):
+            raise ValueError(policy)
+        if policy == 'ttl' and ttl is None:
+            raise ValueError('the ttl policy needs a ttl')
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.ttl = ttl
+        self.sizeof = sizeof or pair_size
+        self.clock = clock
+        self.clear()
+    def clear(self):
+        """
+        Clears the cache of all pairs and resets its counters
+        """
+        # key -> CacheEntry
+        self.entries = HashMap()
+        # sentinel of the chain of use lists; root.higher has the fewest uses.
+        # LRU and TTL keep every entry in a single list
+        self.root = UseList(0)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+    def __len__(self):
+        """
+        Returns how many pairs are in the cache, counting expired pairs not
+        removed yet
+        :return: number of pairs in the cache
+        """
+        return len(self.entries)
+    def listAfter(self, bucket, freq):
+        """
+        Gets the use list for a count, making it right after bucket if needed
+        :param bucket: the UseList the count comes after
+        :param freq: the use count
+        :return: the UseList for freq
+        """
+        if bucket.higher.freq == freq:
+            return bucket.higher
+        new_list = UseList(freq)
+        new_list.lower = bucket
+        new_list.higher = bucket.higher
+        bucket.higher.lower = new_list
+        bucket.higher = new_list
+        return new_list
+    def link(self, entry, bucket):
+        """
+        Adds an entry to the back of a use list
+        :param entry: the CacheEntry to link
+        :param bucket: the UseList to add it to
+        """
+        entry.bucket = bucket
+        entry.prior = bucket.prior
+        entry.next = bucket
+        bucket.prior.next = entry
+        bucket.prior = entry
+    def unlink(self, entry):
+        """
+        Takes an entry out of its use list, dropping the list from the chain if
+        that leaves it empty
+        :param entry: the CacheEntry to unlink
+        """
+        bucket = entry.bucket
+        entry.prior.next = entry.next
+        entry.next.prior = entry.prior
+        entry.next = entry.prior = entry.bucket = None
+        if bucket.is_empty():
+            bucket.lower.higher = bucket.higher
+            bucket.higher.lower = bucket.lower
+    def touch(self, entry):
+        """
+        Records a use of an entry
+        :param entry: the CacheEntry that was used
+        """
+        # TTL order only changes when a pair is set
+        if self.policy == 'ttl':
+            return
+        bucket = entry.bucket
+        # LFU moves the entry up a count, LRU to the back of the same list
+        if self.policy == 'lfu':
+            target = self.listAfter(bucket, bucket.freq + 1)
+        else:
+            target = bucket
+        # unlinking the last entry drops bucket, which is fine for LFU since
+        # target is already chained after it
+        if target is bucket and entry.next is bucket and entry.prior is bucket:
+            return
+        self.unlink(entry)
+        self.link(entry, target)
+    def discard(self, entry):
+        """
+        Removes an entry from the cache
+        :param entry: the CacheEntry to remove
+        """
+        self.unlink(entry)
+        del self.entries[entry.key]
+        self.bytes -= entry.size
+    def expired(self, entry):
+        """
+        Checks whether an entry's time to live has run out
+        :param entry: a CacheEntry
+        :return: True if the entry has expired
+        """
+        return entry.expires is not None and entry.expires <= self.clock()
+    def find(self, key):
+        """
+        Finds the live entry for a key, removing it if it expired
+        :param key: The key we're looking for
+        :return: the CacheEntry, or None if there is no live entry
+        """
+        try:
+            entry = self.entries[key]
+        except KeyError:
+            return None
+        if self.expired(entry):
+            self.discard(entry)
+            self.expirations += 1
+            return None
+        return entry
+    def __contains__(self, key):
+        """
+        Checks to see if a key has a live pair in the cache, without counting
+        a hit or miss
+        :param key: Key we're checking for in the cache
+        :return: boolean, whether key was found or not
+        """
+        return self.find(key) is not None
+    def __getitem__(self, key):
+        """
+        Gets the value cached for a key. If key is not in the cache, a
+        KeyError is raised
+        :param key: The key we're looking for in the cache
+        :return: The value of the key in the cache
+        """
+        entry = self.find(key)
+        if entry is None:
+            self.misses += 1
+            raise KeyError(key)
+        self.hits += 1
+        self.touch(entry)
+        return entry.value
+    def get(self, key, default=None):
+        """
+        Gets the value cached for a key
+        :param key: The key we're looking for in the cache
+        :param default: value given on a miss
+        :return: The value of the key, or default
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+    def __setitem__(self, key, value):
+        """
+        Caches a (key, value) pair, evicting other pairs if the cache is full
+        :param key: key for the pair
+        :param value: value associated with key
+        """
+        now = self.clock()
+        expires = None if self.ttl is None else now + self.ttl
+        size = self.sizeof(key, value)
+        entry = self.find(key)
+        if entry is None:
+            # new pairs start out used once
+            entry = CacheEntry(key, value, size, expires)
+            self.entries[key] = entry
+            self.link(entry, self.listAfter(self.root, 1))
+        else:
+            self.bytes -= entry.size
+            entry.value = value
+            entry.size = size
+            entry.expires = expires
+            # setting a pair restarts its time to live, moving it to the back
+            if self.policy == 'ttl':
+                self.unlink(entry)
+                self.link(entry, self.listAfter(self.root, 1))
+            else:
+                self.touch(entry)
+        self.bytes += size
+        # pairs at the front of a TTL list expire first
+        if self.policy == 'ttl':
+            self.purge(now)
+        self.evict(entry)
+    def purge(self, now):
+        """
+        Removes expired pairs from the front of the TTL list
+        :param now: the current clock time
+        """
+        while self.entries:
+            oldest = self.root.higher.next
+            if oldest.expires > now:
+                break
+            self.discard(oldest)
+            self.expirations += 1
+    def evict(self, keep):
+        """
+        Evicts pairs until the cache is within its limits
+        :param keep: the CacheEntry just set, evicted only if it alone is
+        over the limits
+        """
+        while (self.max_items is not None and
+               len(self.entries) > self.max_items) or \
+                (self.max_bytes is not None and self.bytes > self.max_bytes):
+            bucket = self.root.higher
+            victim = bucket.next
+            if victim is keep:
+                victim = keep.next
+                # keep is alone in the lowest list, look one list up
+                if victim is bucket:
+                    victim = bucket.higher.next
+                    # keep is the only pair in the cache
+                    if victim is self.root:
+                        victim = keep
+            self.discard(victim)
+            self.evictions += 1
+    def __delitem__(self, key):
+        """
+        Deletes a pair from the cache
+        :param key: the key of the pair we want to delete
+        """
+        entry = self.find(key)
+        if entry is None:
+            raise KeyError(key)
+        self.discard(entry)
+    def __iter__(self):
+        """
+        Iterates through the live pairs of the cache, yielding (key, value)
+        pairs
+        """
+        for key, entry in list(self.entries):
+            if not self.expired(entry):
+                yield key, entry.value
+    def stats(self):
+        """
+        Gets a snapshot of the cache's counters
+        :return: dictionary of hits, misses, evictions, expirations, items and
+        bytes
+        """
+        return {'hits': self.hits, 'misses': self.misses,
+                'evictions': self.evictions, 'expirations': self.expirations,
+                'items': len(self.entries), 'bytes': self.bytes}
+    def __repr__(self):
+        """
+        A string representation of this cache
+        :return: A string representing this cache
+        """
+        return '{{{0}}}'.format(','.join('{0}:{1}'.format(k, v) for k, v in self))
+def pair_size(key, value):
+    """
+    Default size of a cached pair
+    :param key: key for the pair
+    :param value: value associated with key
+    :return: bytes used by the key and value objects themselves
+    """
+    return sys.getsizeof(key) + sys.getsizeof(value)
+# layout of a MappedHashMap file: a header, the index array of slots holding
+# entry numbers (EMPTY if unused), fixed-width entry records in insertion
+# order, then a heap holding the bytes of str and bytes keys and values
+MAPPED_MAGIC = b'HASHMAP1'
+# magic, bytes per index slot, number of slots, number of entries
+MAPPED_HEADER = struct.Struct('<8sB7xqq')
+# stable hash, key type, value type, then two fields each for the key and
+# value: heap offset and length, or the value itself and 0 for fixed types
+MAPPED_ENTRY = struct.Struct('<qBB6xqqqq')
+# type tags for mapped keys and values
+TYPE_NONE, TYPE_BOOL, TYPE_INT, TYPE_FLOAT, TYPE_STR, TYPE_BYTES = range(6)
+INT64 = struct.Struct('<q')
+FLOAT64 = struct.Struct('<d')
+class MappedHashMap:
+    """
+    A read-only hashmap served straight from a file through mmap. The file is
+    written once by MappedHashMap.write and can be opened by many processes,
+    which then share one copy of it in the page cache. Keys and values may be
+    None, bools, 64-bit ints, floats, strs or bytes
+    """
+    def __init__(self, path):
+        """
+        Opens a file written by MappedHashMap.write
+        :param path: path of the file
+        """
+        with open(path, 'rb') as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, width, self.size, self.items = \
+            MAPPED_HEADER.unpack_from(self.map, 0)
+        if magic != MAPPED_MAGIC:
+            raise ValueError('{0} is not a mapped hashmap'.format(path))
+        self.slot = struct.Struct('<i' if width == 4 else '<q')
+        self.entries_at = pad8(MAPPED_HEADER.size + self.size * width)
+        self.heap_at = self.entries_at + self.items * MAPPED_ENTRY.size
+    @classmethod
+    def write(cls, source, path, load_factor=.5):
+        """
+        Writes pairs to a file in the mapped hashmap layout
+        :param source: a mapping, HashMap or iterable of (key, value) pairs
+        :param path: path of the file to write
+        :param load_factor: The maximum load factor of the file's index
+        """
+        # a HashMap drops duplicate keys and fixes the entry order
+        pairs = HashMap.from_pairs(source)
+        size = capacity_for(len(pairs), load_factor)
+        width = 4 if len(pairs) < 2**31 else 8
+        index = array('i' if width == 4 else 'q', [EMPTY]) * size
+        entries = bytearray()
+        heap = bytearray()
+        for number, (key, value) in enumerate(pairs):
+            val = stable_hash(key)
+            i = 0
+            slot = val % size
+            while index[slot] != EMPTY:
+                i += 1
+                slot = hash_index(val, i, size)
+            index[slot] = number
+            key_type, key_a, key_b = encode_mapped(key, heap)
+            value_type, value_a, value_b = encode_mapped(value, heap)
+            entries += MAPPED_ENTRY.pack(val, key_type, value_type, key_a,
+                                         key_b, value_a, value_b)
+        header = MAPPED_HEADER.pack(MAPPED_MAGIC, width, size, len(pairs))
+        index_bytes = index.tobytes() if sys.byteorder == 'little' else \
+            struct.pack('<{0}{1}'.format(size, index.typecode), *index)
+        with open(path, 'wb') as f:
+            f.write(header)
+            f.write(index_bytes)
+            f.write(bytes(pad8(f.tell()) - f.tell()))
+            f.write(entries)
+            f.write(heap)
+    def decode(self, type_tag, a, b):
+        """
+        Reads a key or value stored in the file
+        :param type_tag: the TYPE_ constant it was stored with
+        :param a: heap offset, or the stored value for fixed types
+        :param b: length in the heap
+        :return: the key or value
+        """
+        if type_tag == TYPE_STR:
+            return self.map[self.heap_at + a:self.heap_at + a + b].decode()
+        if type_tag == TYPE_BYTES:
+            return self.map[self.heap_at + a:self.heap_at + a + b]
+        if type_tag == TYPE_INT:
+            return a
+        if type_tag == TYPE_FLOAT:
+            return FLOAT64.unpack(INT64.pack(a))[0]
+        if type_tag == TYPE_BOOL:
+            return bool(a)
+        return None
+    def entry(self, number):
+        """
+        Reads an entry record
+        :param number: position of the entry in insertion order
+        :return: tuple of the record's fields
+        """
+        return MAPPED_ENTRY.unpack_from(
+            self.map, self.entries_at + number * MAPPED_ENTRY.size)
+    def find(self, key):
+        """
+        Finds the entry record of a key
+        :param key: The key we're looking for
+        :return: the record's fields, or None if the key isn't in the map
+        """
+        try:
+            val = stable_hash(key)
+        # keys of a type the file can't store can't be in it
+        except TypeError:
+            return None
+        i = 0
+        slot = val % self.size
+        number = self.slot.unpack_from(
+            self.map, MAPPED_HEADER.size + slot * self.slot.size)[0]
+        while number != EMPTY:
+            record = self.entry(number)
+            if record[0] == val and \
+                    self.decode(record[1], record[3], record[4]) == key:
+                return record
+            i += 1
+            slot = hash_index(val, i, self.size)
+            number = self.slot.unpack_from(
+                self.map, MAPPED_HEADER.size + slot * self.slot.size)[0]
+        return None
+    def __len__(self):
+        """
+        Returns how many items are in the hashmap
+        :return: number of items in the hashmap
+        """
+        return self.items
+    def buckets(self):
+        """
+        Gives the capacity of the hashmap
+        :return: capacity of the hashmap
+        """
+        return self.size
+    def load(self):
+        """
+        Calculates the load factor of the hashmap
+        :return: (items in hashmap)/(capacity of hashmap)
+        """
+        return float(self.items)/self.size
+    def __contains__(self, key):
+        """
+        Checks to see if the key is in the hashmap
+        :param key: Key we're checking for in hashmap
+        :return: boolean, whether key was found or not
+        """
+        return self.find(key) is not None
+    def __getitem__(self, key):
+        """
+        Gets the value associated with a key in the hashmap. If key is not in
+        hashmap, a KeyError is raised
+        :param key: The key we're looking for in the hashmap
+        :return: The value of the key in the hashmap.
+        """
+        record = self.find(key)
+        if record is None:
+            raise KeyError(key)
+        return self.decode(record[2], record[5], record[6])
+    def get(self, key, default=None):
+        """
+        Gets the value associated with a key in the hashmap
+        :param key: The key we're looking for in the hashmap
+        :param default: value given if the key isn't in the hashmap
+        :return: The value of the key, or default
+        """
+        record = self.find(key)
+        if record is None:
+            return default
+        return self.decode(record[2], record[5], record[6])
+    def __iter__(self):
+        """
+        Iterates through the hashmap in insertion order, yielding (key, value)
+        pairs
+        """
+        for number in range(self.items):
+            record = self.entry(number)
+            yield (self.decode(record[1], record[3], record[4]),
+                   self.decode(record[2], record[5], record[6]))
+    def keys(self):
+        """
+        Gets the set of keys within the hashmap
+        :return: set of keys in hashmap
+        """
+        return set(key for key, value in self)
+    def close(self):
+        """
+        Unmaps the file
+        """
+        self.map.close()
+    def __enter__(self):
+        """
+        Uses the map as a context manager that closes it on exit
+        :return: the map
+        """
+        return self
+    def __exit__(self, *exc_info):
+        """
+        Closes the map at the end of a with block
+        """
+        self.close()
+    def __repr__(self):
+        """
+        A string representation of this map
+        :return: A string representing this map
+        """
+        return '{{{0}}}'.format(','.join('{0}:{1}'.format(k, v) for k, v in self))
+def stable_hash(key):
+    """
+    Hashes a key the same way in every process. Python randomizes the hashes
+    of str and bytes per process, so those are hashed with blake2b instead
+    :param key: a key that can be stored in a MappedHashMap
+    :return: a signed 64-bit hash
+    """
+    if isinstance(key, str):
+        key = key.encode()
+    if isinstance(key, bytes):
+        digest = hashlib.blake2b(key, digest_size=8).digest()
+        return INT64.unpack(digest)[0]
+    if key is None:
+        return 0
+    # numbers hash deterministically, and equal ints and floats hash alike
+    if isinstance(key, (int, float)):
+        return hash(key)
+    raise TypeError('unsupported key type: {0}'.format(type(key).__name__))
+def encode_mapped(item, heap):
+    """
+    Encodes a key or value for a MappedHashMap entry record
+    :param item: the key or value
+    :param heap: bytearray that str and bytes data is appended to
+    :return: (type tag, first field, second field) for the record
+    """
+    if item is None:
+        return TYPE_NONE, 0, 0
+    if isinstance(item, bool):
+        return TYPE_BOOL, int(item), 0
+    if isinstance(item, int):
+        if not -2**63 <= item < 2**63:
+            raise ValueError('int does not fit in 64 bits: {0}'.format(item))
+        return TYPE_INT, item, 0
+    if isinstance(item, float):
+        return TYPE_FLOAT, INT64.unpack(FLOAT64.pack(item))[0], 0
+    if isinstance(item, str):
+        type_tag, data = TYPE_STR, item.encode()
+    elif isinstance(item, bytes):
+        type_tag, data = TYPE_BYTES, item
+    else:
+        raise TypeError('unsupported type: {0}'.format(type(item).__name__))
+    offset = len(heap)
+    heap += data
+    return type_tag, offset, len(data)
+def pad8(offset):
+    """
+    Rounds a file offset up to a multiple of 8
+    :param offset: the offset
+    :return: the rounded offset
+    """
+    return (offset + 7) // 8 * 8
 def hash2(val, i):
     """
     Second hash function for double hashing. Calculates a second index based
@@ -247,6 +1400,109 @@ def hash2(val, i):
     """
     primes = [17, 13, 19, 11]
     return (1 + (val % primes[i % 4]))
+def hash_index(val, i, size):
+    """
+    Calculates the i-th index of a hash value's probe sequence
+    :param val: The hash value for the key object
+    :param i: how many indices of the sequence have been tried already
+    :param size: capacity of the index array
+    :return: an index in the index array
+    """
+    # once every probe has been tried, fall back to a linear scan so
+    # that an EMPTY slot is always reached
+    if i >= size:
+        return (val + i) % size
+    return (val % size + (i*(hash2(val, i)))) % size
+def capacity_for(count, load_factor):
+    """
+    Finds the capacity a hashmap needs to hold a number of pairs without
+    rehashing
+    :param count: number of pairs
+    :param load_factor: The maximum load factor of the hashmap
+    :return: the smallest capacity of the form 10 * 2**k that fits count
+    """
+    size = 10
+    while count >= load_factor * size:
+        size *= 2
+    return size
+def count_array(values):
+    """
+    Counts the occurrences of each integer in a numpy array
+    :param values: a numpy array of integers
+    :return: a HashMap of each distinct integer and its number of occurrences
+    """
+    import numpy
+    values = values.ravel()
+    if len(values) == 0:
+        return HashMap()
+    low = int(values.min())
+    span = int(values.max()) - low + 1
+    # a dense range is counted in one bincount pass, anything sparser by
+    # sorting through unique
+    if span <= 2 * len(values):
+        # offsets are taken in a wide type, since the span of a narrow dtype
+        # can overflow its own range
+        wide = numpy.uint64 if values.dtype.kind == 'u' else numpy.int64
+        counts = numpy.bincount(numpy.subtract(values, low, dtype=wide),
+                                minlength=span)
+        keys = numpy.flatnonzero(counts)
+        counts = counts[keys]
+        keys = keys.astype(wide) + wide(low)
+    else:
+        keys, counts = numpy.unique(values, return_counts=True)
+    # the number of distinct keys is known, so the map is sized once
+    counts_map = HashMap(capacity=len(keys))
+    counts_map.set_many(keys.tolist(), counts.tolist())
+    return counts_map
+def record(histogram, probes):
+    """
+    Counts one operation in a probe length histogram
+    :param histogram: list where index n counts operations that probed n slots
+    :param probes: number of slots the operation probed
+    """
+    while len(histogram) <= probes:
+        histogram.append(0)
+    histogram[probes] += 1
+def histogram_items(histogram):
+    """
+    Gets the non-zero counts of a probe length histogram
+    :param histogram: list where index n counts operations that probed n slots
+    :return: iterator of (probes, count) pairs
+    """
+    return ((probes, count) for probes, count in enumerate(histogram) if count)
+def retype(table, stats):
+    """
+    Rewraps a table's storage as an InstrumentedTable or a plain IndexTable
+    :param table: the table whose storage is reused
+    :param stats: MapStats to record into, or None for a plain table
+    :return: a table sharing the given table's index and entries
+    """
+    if stats is None:
+        new_table = IndexTable(0)
+    else:
+        new_table = InstrumentedTable(0, stats)
+    new_table.size = table.size
+    new_table.indices = table.indices
+    new_table.hashes = table.hashes
+    new_table.keys = table.keys
+    new_table.values = table.values
+    return new_table
+def index_array(size):
+    """
+    Makes an index array of EMPTY slots, using the narrowest signed integer
+    type that can hold every position in a table of that capacity
+    :param size: number of slots
+    :return: an array of EMPTY slots
+    """
+    if size < 2**7:
+        typecode = 'b'
+    elif size < 2**15:
+        typecode = 'h'
+    elif size < 2**31:
+        typecode = 'i'
+    else:
+        typecode = 'q'
+    return array(typecode, [EMPTY]) * size
 # Required Function
 def year_count(input_hashmap):
     """
@@ -254,17 +1510,5 @@ def year_count(input_hashmap):
     :input: A HashMap of student name and its birth year
     :return: A HashMap of the year and the number of students born in that year
     """
-    # initialize new hashmap
-    new_map = HashMap()
-    # loop through input hashmap
-    for pair in input_hashmap:
-        # if the year isn't already a key in the hashmap
-        if pair[1] not in new_map:
-            # make it a key, and have 1 be it's associated value because there
-            # is now one person with that birth year
-            new_map[pair[1]] = 1
-        # if the year is already in the map
-        else:
-            # add one to that year's value
-            new_map[pair[1]] += 1
-    return new_map
+    # count the birth year of each (name, year) pair
+    return HashMap.count_by(year for name, year in input_hashmap)
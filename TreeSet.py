@@ -3,128 +3,212 @@
 ######################
 """
 Defines all necessary objects and functions to implement and manipulate an
-AVLTree
+AVLTree. Inserts and removes rebalance with rotations so that the tree's height
+stays logarithmic in its size.
+A tree is ordered either by a three-way comparison function, called once per
+node visited, or by the sort key of each item, computed once, stored in its
+node and compared with the native < and ==. Node methods take the sort key of
+the item they look for and comp, which is None when keys compare natively.
+TreeMap maps keys to values on the same tree, holding each value in its key's
+node. SortedListSet offers the TreeSet interface over a list of sorted blocks,
+trading the tree's nodes for compact lists.
+Trees are persistent: a node is only changed in place by the tree that owns
+it, and any other tree copies it first, so snapshots share every node with the
+tree they were taken from and updates copy just the nodes they change
 """
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import cmp_to_key
+from itertools import accumulate, chain, islice
+from operator import attrgetter, itemgetter
+# marks the end of a sequence being merged
+DONE = object()
+# marks an argument that wasn't given
+MISSING = object()
+# number of items a SortedListSet block is split back down to
+BLOCK_SIZE = 1000
+# layout of a file written by TreeSet.dump or SortedListSet.dump: a header,
+# then the items in order, packed by their type
+DUMP_MAGIC = b'TREESET1'
+# magic, type of the items, number of items
+DUMP_HEADER = struct.Struct('<8sB7xq')
+# how the items are packed: 64-bit ints and floats as arrays, strs as an array
+# of their lengths followed by their utf-8 text, anything else as a pickle
+DUMP_INT, DUMP_FLOAT, DUMP_STR, DUMP_PICKLE = range(4)
 class TreeNode:
     """
     A TreeNode to be used by the TreeSet
     """
-    def __init__(self, data=None):
+    # value is only used by TreeMap. owner is the tree allowed to change the
+    # node in place, any other tree shares it and copies it before writing
+    __slots__ = ('data', 'key', 'value', 'left', 'right', 'height', 'balance',
+                 'size', 'owner')
+    def __init__(self, data=None, key=None, value=None):
         """
         Constructor
         You can add additional data as needed
         :param data:
+        :param key: the sort key of data, which is data itself in a tree
+        ordered by a comparison function
+        :param value: the value data maps to in a TreeMap
         """
         self.data = data
+        self.key = key
+        self.value = value
+        # the tree that may change this node in place, see TreeSet.snapshot
+        self.owner = None
         self.left = None
         self.right = None
         self.height = 0
         self.balance = 0
+        # number of nodes in the subtree rooted here
+        self.size = 1
     def __iter__(self):
         """
         Iterator
-        Returns each node's data in the tree set
+        Returns each node's data in the tree set, using a stack of the nodes
+        whose right subtrees are still to be visited instead of recursion
         """
-        if self.left:
-            yield from self.left
-        yield self.data
-        if self.right:
-            yield from self.right
+        stack = []
+        node = self
+        while stack or node is not None:
+            # go as far left as possible, remembering the way back
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.data
+            node = node.right
     def maximum(self, comp):
         """
         Returns the maximum data item in the tree
         :param comp: comparison function for nodes
         """
-        if self.right is None:
-            return self
-        else:
-            return self.right.maximum(comp)
+        node = self
+        while node.right is not None:
+            node = node.right
+        return node
+    def nodes(self):
+        """
+        Iterates over the nodes of the subtree in order
+        """
+        stack = []
+        node = self
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+    def copy(self, owner):
+        """
+        Copies the node, sharing its subtrees
+        :param owner: the owner of the copy
+        :return: the copy
+        """
+        node = TreeNode(self.data, self.key, self.value)
+        node.left = self.left
+        node.right = self.right
+        node.height = self.height
+        node.balance = self.balance
+        node.size = self.size
+        node.owner = owner
+        return node
     def get_height(self):
         """
         Gets the height of the tree
         :return: height of the tree
         """
-        # base case for end of left tree
-        if self.left is None:
-            l_height = -1
-        else:
-            # recursively call get_height on left child
-            l_height = self.left.get_height()
-        # base case for end of right tree
-        if self.right is None:
-            r_height = -1
-        else:
-            # recursively call get_height on right child
-            r_height = self.right.get_height()
-        return 1 + max(l_height, r_height)
-    def insert(self, item, comp, parent, tree):
+        # heights are kept up to date by every insert, delete and rotation
+        return self.height
+    def locate(self, k, comp, path=None):
+        """
+        Searches the subtree for a sort key, comparing once per node visited
+        :param k: the sort key we're looking for
+        :param comp: a comparison function, or None to compare keys natively
+        :param path: list the nodes above the one found are added to, or None
+        :return: (node, 0) if the key was found, otherwise (None, c) where c
+        is the sign of the key against the last node visited
+        """
+        c = 0
+        node = self
+        # native keys skip the three-way step, most levels need only the <
+        if comp is None:
+            while node is not None:
+                if k < node.key:
+                    c = -1
+                elif k == node.key:
+                    return node, 0
+                else:
+                    c = 1
+                if path is not None:
+                    path.append(node)
+                node = node.left if c < 0 else node.right
+            return None, c
+        while node is not None:
+            c = comp(k, node.key)
+            if c == 0:
+                return node, 0
+            if path is not None:
+                path.append(node)
+            # look left if key is less than node, right if greater
+            node = node.left if c < 0 else node.right
+        return None, c
+    def insert(self, item, k, comp, tree):
         """
-        Inserts the item into the tree, starts at the root node
+        Inserts the item into the subtree rooted at this node, rebalancing the
+        path back up to this node
         :param item:
-        :param comp: a comparison function for nodes
-        :param parent: the parent node
-        :param tree: the tree in question
-        :return: If the operation was successful
+        :param k: the item's sort key
+        :param comp: a comparison function, or None to compare keys natively
+        :param tree: the tree in question, whose length is updated
+        :return: root of the subtree after the insert
         """
-        # to pass code formatting test when rebalance is commented out
-        parent = parent
-        # handles if item needs to go to the left
-        if comp(item, self.data) < 0:
-            # if left is open, insert there and update params
-            if self.left is None:
-                self.left = TreeNode(item)
-                tree.length += 1
-                self.height += 1
-                self.updateBalance()
-                return True
-            # if left is not open, recursively call insert on left node
-            else:
-                succesful = self.left.insert(item, comp, self, tree)
-                # I tried to get rebalancing, to work, but ultimately
-                # failed. If you want to see what happens when my algorithm
-                # is implemented, uncomment self.rebalance(parent, comp) both
-                # here and in next comparison
-                # self.rebalance(parent, comp)
-                return succesful
-        # handles if item needs to go to the right
-        elif comp(item, self.data) > 0:
-            # if right is open, insert there and update params
-            if self.right is None:
-                self.right = TreeNode(item)
-                tree.length += 1
-                self.height += 1
-                self.updateBalance()
-                return True
-            # if right not open, recursively call insert on right node
-            else:
-                succesful = self.right.insert(item, comp, self, tree)
-                # uncomment this if you want to see how my rebalance doesn't
-                # work -- infinite loop
-                # self.rebalance(parent, comp)
-                return succesful
-        # if item is already in list, return false
+        # nodes from this one down to the new node's parent
+        path = []
+        node, c = self.locate(k, comp, path)
+        # if item is already in tree, nothing changes
+        if node is not None:
+            return self
+        # the path is about to change, so it has to belong to the tree
+        thaw_path(path, tree.owner)
+        new = TreeNode(item, k)
+        new.owner = tree.owner
+        # the search fell off the side of the parent the item goes on
+        if c < 0:
+            path[-1].left = new
         else:
-            return False
-    def rebalance(self, parent, comp):
+            path[-1].right = new
+        tree.length += 1
+        return rebalance_path(path, tree.owner)
+    def rebalance(self, owner=None):
         """
-        Rebalances the node in question for O(logn) time complexity
-        :param parent: parent of node
-        :param comp: comparison function
+        Rebalances the node in question for O(logn) time complexity. Its
+        subtrees must already be balanced
+        :param owner: the tree owning this node, which children are copied to
+        before a rotation changes them
+        :return: root of the subtree after rebalancing
         """
         self.updateHeights()
+        self.updateSize()
         self.updateBalance()
         # if balance is left-heavy
         if self.balance > 1:
             if self.left.balance < 0:       # left-right case
-                self.left.rotate_left(parent, comp)
+                self.left = thaw(self.left, owner).rotate_left(owner)
                                                 # left-left case
-            self.rotate_right(parent, comp)
+            return self.rotate_right(owner)
         # if balance is right-heavy
         if self.balance < -1:
             if self.right.balance > 0:       # right-left case
-                self.right.rotate_right(parent, comp)
+                self.right = thaw(self.right, owner).rotate_right(owner)
                                                       # right-right case
-            self.rotate_left(parent, comp)
+            return self.rotate_left(owner)
+        return self
     def get_right_height(self):
         """
         Returns the height of the right subtree
@@ -143,6 +227,29 @@ class TreeNode:
             return -1
         else:
             return self.left.height
+    def get_left_size(self):
+        """
+        Returns the number of nodes in the left subtree
+        :return: size (int)
+        """
+        if self.left is None:
+            return 0
+        else:
+            return self.left.size
+    def get_right_size(self):
+        """
+        Returns the number of nodes in the right subtree
+        :return: size (int)
+        """
+        if self.right is None:
+            return 0
+        else:
+            return self.right.size
+    def updateSize(self):
+        """
+        Updates the subtree size of node
+        """
+        self.size = 1 + self.get_left_size() + self.get_right_size()
     def updateHeights(self):
         """
         Updates the height of node
@@ -153,244 +260,214 @@ class TreeNode:
         Updates the balance parameter of node
         """
         self.balance = self.get_left_height() - self.get_right_height()
-    def rotate_right(self, parent, comp):
+    def rotate_right(self, owner=None):
         """
         Rotates a node right for rebalancing a tree
-        :param parent: parent of node
-        :param comp: comparison function
-        """
-        # set the new root, new root's left, and store old root
-        new_root = self.left
-        new_left = new_root.right
-        old_root = self
-        # updates the tree with new_root and subtrees
-        old_root.left = new_left
-        new_root.right = old_root
-        # if new root is greater, set parent's right to point to the new root
-        if comp(new_root.data, parent.data) > 0:
-            parent.right = new_root
-        # if new root is lesser, set parent's left to point to new root
-        elif comp(new_root.data, parent.data) < 0:
-            parent.left = new_root
-        # update the height and balance of node and its right node
+        :param owner: the tree owning this node, which the left child is
+        copied to if it belongs to another
+        :return: the new root of the subtree, the node's old left child
+        """
+        # set the new root and move its right subtree under the old root
+        new_root = thaw(self.left, owner)
+        self.left = new_root.right
+        new_root.right = self
+        # update the height, size and balance of the old root, then the new one
         self.updateHeights()
+        self.updateSize()
         self.updateBalance()
-        self.right.updateHeights()
-        self.right.updateBalance()
-    def rotate_left(self, parent, comp):
+        new_root.updateHeights()
+        new_root.updateSize()
+        new_root.updateBalance()
+        return new_root
+    def rotate_left(self, owner=None):
         """
         Rotates a node left for rebalancing a tree
-        :param parent: parent of node
-        :param comp: comparison function
-        """
-        # set the new root, new root's left, and store old root
-        new_root = self.right
-        new_left_sub = new_root.left
-        old_root = self
-        # update the tree with new_root and subtrees
-        old_root.right = new_left_sub
-        new_root.left = old_root
-        # if new root is greater, set parent's right to point to new root
-        if comp(new_root.data, parent.data) > 0:
-            parent.right = new_root
-        # if new root is lesser, set parent's left to point to new root
-        elif comp(new_root.data, parent.data) < 0:
-            parent.left = new_root
-        # update the height and balance of node and its left node
+        :param owner: the tree owning this node, which the right child is
+        copied to if it belongs to another
+        :return: the new root of the subtree, the node's old right child
+        """
+        # set the new root and move its left subtree under the old root
+        new_root = thaw(self.right, owner)
+        self.right = new_root.left
+        new_root.left = self
+        # update the height, size and balance of the old root, then the new one
         self.updateHeights()
+        self.updateSize()
         self.updateBalance()
-        self.left.updateHeights()
-        self.left.updateBalance()
-    def containsNode(self, item, comp):
+        new_root.updateHeights()
+        new_root.updateSize()
+        new_root.updateBalance()
+        return new_root
+    def containsNode(self, k, comp):
         """
         Checks to see if a node has an item in any of its subtrees
-        :param item: The item we are looking for
-        :param comp: a comparison function
+        :param k: sort key of the item we are looking for
+        :param comp: a comparison function, or None to compare keys natively
         :return: True if node is found, False if not
         """
-        # if tree is empty
-        if self.data is None:
-            return False
-        # if item is less than node
-        elif comp(item, self.data) < 0:
-            # if left is empty, item is not in tree
-            if self.left is None:
-                return False
-            # recursively call containsNode on left
-            return self.left.containsNode(item, comp)
-        # if item is greater than node
-        elif comp(item, self.data) > 0:
-            # if right is empty, item is not in tree
-            if self.right is None:
-                return False
-            # recursively call containsNode on right
-            return self.right.containsNode(item, comp)
-        # if item == data in the node, return True
-        else:
-            return True
-    def delete_node(self, comp, item, parent, tree):
+        return self.locate(k, comp)[0] is not None
+    def delete_node(self, k, comp, tree):
         """
-        Deletes a node from the tree
-        :param comp: a comparison function
-        :param item: item to Delete
-        :param parent: parent of node
-        :param tree: The overall tree in which we're deleting
-        :return: True if item was found and deleted
-        """
-        # if we're at the node in question
-        if not comp(item, self.data):
-            # if that node is the root node
-            if not comp(self.data, tree.root.data):
-                # if root has no left subtree, change root to right subtree
-                if tree.root.left is None:
-                    tree.root = tree.root.right
-                    tree.length -= 1
-                    return True
-                # if root has no right subtree, change root to left subtree
-                elif tree.root.right is None:
-                    tree.root = tree.root.left
-                    tree.length -= 1
-                    return True
-                # if tree has both right and left subtrees
-                else:
-                    # store self in a temp variable and find least successor and
-                    # least successor's parent
-                    temp = self
-                    least_succ = self.right.minimum(comp)
-                    least_succ_parent = self.right.minParent(comp, self.right)
-                    # update the nodes that will have changes in their data
-                    least_succ_parent.left = least_succ.right
-                    least_succ.right = temp.right
-                    least_succ.left = temp.left
-                    # empty out the deleted node
-                    self.right = None
-                    self.left = None
-                    # set node to least successor and set new root of tree
-                    tree.root = least_succ
-                    tree.length -= 1
-                    return True
-            # if deleted node is a leaf node
-            if self.right is None and self.left is None:
-                # if right leaf node, update parent
-                if comp(parent.data, self.data) < 0:
-                    parent.right = None
-                    tree.length -= 1
-                    return True
-                # if left leaf node, update parent
-                else:
-                    parent.left = None
-                    tree.length -= 1
-                    return True
-            # if deleted node only has left children
-            elif self.right is None and self.left:
-                # if right node of parent, set parent's new right
-                if comp(parent.data, self.data) < 0:
-                    parent.right = self.left
-                    self.left = None
-                    tree.length -= 1
-                    return True
-                # if left node of parent, set parent's new left
-                else:
-                    parent.left = self.left
-                    self.left = None
-                    tree.length -= 1
-                    return True
-            # if deleted node only has right children
-            elif self.left is None and self.right:
-                # if right node of parent, set parent's new right
-                if comp(parent.data, self.data) < 0:
-                    parent.right = self.right
-                    self.right = None
-                    tree.length -= 1
-                    return True
-                # if left node of parent, set parent's new left
-                else:
-                    parent.left = self.right
-                    self.right = None
-                    tree.length -= 1
-                    return True
-            # if deleted node has both left and right children
-            elif self.left and self.right:
-                temp = self
-                # obtain least successor and least successor's parent
-                least_succ = self.right.minimum(comp)
-                least_succ_parent = self.right.minParent(comp, self.right)
-                # if least successor had a right, update parent's left to that
-                if least_succ.right:
-                    least_succ_parent.left = least_succ.right
-                # if deleted node was to the left of parent
-                if comp(parent.data, self.data) > 0:
-                    # update parent's left to be least successor
-                    parent.left = least_succ
-                # if deleted node was right of parent
-                else:
-                    # update parent's right to be least successor
-                    parent.right = least_succ
-                # if least succssor and parent of least successor are the same
-                if not comp(least_succ_parent.data, least_succ.data):
-                    # if we're dealing with the root node
-                    # (this is a special case with only 3 nodes in tree)
-                    if not comp(self.data, parent.data):
-                        # set self to right node of root, update left and
-                        # root of the tree
-                        self.left = temp.left
-                        tree.root = self
-                    # if we're not dealing with the root node
-                    else:
-                        # if node we're deleting is to the right of parent
-                        if comp(parent.data, self.data) < 0:
-                            # update parent's right, the node in question,
-                            # and that node's left
-                            parent.right = temp.right
-                            self.left = temp.left
-                        # if node we're deleting is to the left of parent
-                        else:
-                            # update parent's left, the node in question,
-                            # and that node's left
-                            parent.left = temp.right
-                            self.left = temp.left
-                # update tree length and return
-                tree.length -= 1
-                return True
-        # if the item is less than the node we're looking at
-        if comp(item, self.data) < 0:
-            # if left is empty, node isn't in tree
-            if self.left is None:
+        Deletes an item from the subtree rooted at this node, rebalancing the
+        path back up to this node
+        :param k: sort key of the item to Delete
+        :param comp: a comparison function, or None to compare keys natively
+        :param tree: The overall tree in which we're deleting, whose length is
+        updated
+        :return: root of the subtree after the delete
+        """
+        # nodes from this one down to the parent of the node being deleted
+        path = []
+        node = self.locate(k, comp, path)[0]
+        # node isn't in tree
+        if node is None:
+            return self
+        tree.length -= 1
+        return unlink_node(node, path, tree.owner)
+    def rank(self, k, comp):
+        """
+        Counts the items in the subtree that are less than an item
+        :param k: sort key of the item to rank, which doesn't have to be in
+        the tree
+        :param comp: a comparison function, or None to compare keys natively
+        :return: number of items less than item
+        """
+        rank = 0
+        node = self
+        while node is not None:
+            if comp is None:
+                c = (k > node.key) - (k < node.key)
+            else:
+                c = comp(k, node.key)
+            # everything in a left subtree we skip past is smaller
+            if c < 0:
+                node = node.left
+            elif c > 0:
+                rank += node.get_left_size() + 1
+                node = node.right
+            else:
+                return rank + node.get_left_size()
+        return rank
+    def select(self, k):
+        """
+        Finds the k-th smallest node in the subtree
+        :param k: index of the node in sorted order, starting at 0. Must be
+        less than the size of the subtree
+        :return: the node
+        """
+        node = self
+        while True:
+            left_size = node.get_left_size()
+            # the node is in the left subtree
+            if k < left_size:
+                node = node.left
+            # the node is in the right subtree, past left_size + 1 nodes
+            elif k > left_size:
+                k -= left_size + 1
+                node = node.right
+            else:
+                return node
+    def floor(self, k, comp, inclusive=True):
+        """
+        Finds the greatest node in the subtree below an item
+        :param k: sort key of the item to compare against
+        :param comp: a comparison function, or None to compare keys natively
+        :param inclusive: whether a node equal to item counts
+        :return: the node, or None if every node is above item
+        """
+        best = None
+        node = self
+        while node is not None:
+            if comp is None:
+                c = (node.key > k) - (node.key < k)
+            else:
+                c = comp(node.key, k)
+            # node qualifies, but something to its right might be closer
+            if c < 0 or (c == 0 and inclusive):
+                best = node
+                node = node.right
+            else:
+                node = node.left
+        return best
+    def ceiling(self, k, comp, inclusive=True):
+        """
+        Finds the least node in the subtree above an item
+        :param k: sort key of the item to compare against
+        :param comp: a comparison function, or None to compare keys natively
+        :param inclusive: whether a node equal to item counts
+        :return: the node, or None if every node is below item
+        """
+        best = None
+        node = self
+        while node is not None:
+            if comp is None:
+                c = (node.key > k) - (node.key < k)
+            else:
+                c = comp(node.key, k)
+            # node qualifies, but something to its left might be closer
+            if c > 0 or (c == 0 and inclusive):
+                best = node
+                node = node.left
+            else:
+                node = node.right
+        return best
+    def irange(self, lo, hi, comp, reverse=False, inclusive=(True, False)):
+        """
+        Iterates over the nodes in the subtree that fall between two bounds.
+        Only the path down to the first node in range is visited before
+        iteration starts
+        :param lo: sort key of the lower bound, or None for no lower bound
+        :param hi: sort key of the upper bound, or None for no upper bound
+        :param comp: a comparison function, or None to compare keys natively
+        :param reverse: whether to iterate from hi down to lo
+        :param inclusive: whether lo and hi themselves are in range
+        """
+        def below(node):
+            # node comes before the range
+            if lo is None:
                 return False
-            # recursively call delete_node on left node
-            return self.left.delete_node(comp, item, self, tree)
-        # if the item is greater than node we're looking at
-        else:
-            # if right is empty, node isn't in tree
-            if self.right is None:
+            c = compare(node.key, lo, comp)
+            return c < 0 or (c == 0 and not inclusive[0])
+        def above(node):
+            # node comes after the range
+            if hi is None:
                 return False
-            # recursively call delete_node on right node
-            return self.right.delete_node(comp, item, self, tree)
+            c = compare(node.key, hi, comp)
+            return c > 0 or (c == 0 and not inclusive[1])
+        # in reverse the roles of the children and the bounds swap
+        if reverse:
+            before, after, near, far = above, below, 'right', 'left'
+        else:
+            before, after, near, far = below, above, 'left', 'right'
+        # stack the nodes that aren't before the range on the way down to the
+        # first one that is in it, like the spine an in-order walk would stack
+        stack = []
+        node = self
+        while node is not None:
+            if before(node):
+                node = getattr(node, far)
+            else:
+                stack.append(node)
+                node = getattr(node, near)
+        while stack:
+            node = stack.pop()
+            if after(node):
+                return
+            yield node
+            node = getattr(node, far)
+            while node is not None:
+                stack.append(node)
+                node = getattr(node, near)
     def minimum(self, comp):
         """
         Find the minimum item in the tree
         :param comp: a comparison function
         :return: minimum node in tree
         """
-        # if at minimum node, return it
-        if self.left is None:
-            return self
-        else:
-            # recursively call minimum on left child
-            return self.left.minimum(comp)
-    def minParent(self, comp, parent):
-        """
-        Find the parent of the minimum item in the tree
-        :param comp: a comparison function
-        :param parent: parent of the node
-        :return: minimum node's parent in tree
-        """
-        # if at minimum node, return its parent
-        if self.left is None:
-            return parent
-        else:
-            # recursively call minParent on left node
-            return self.left.minParent(comp, self)
+        node = self
+        while node.left is not None:
+            node = node.left
+        return node
     def __repr__(self):
         """
         A string representing this node
@@ -401,17 +478,55 @@ class TreeSet:
     """
     A set data structure backed by a tree.
     Items will be stored in an order determined by a comparison
-    function rather than their natural order.
+    function, or by a key function, rather than their natural order.
     """
-    def __init__(self, comp):
+    def __init__(self, comp=None, items=None, key=None):
         """
         Constructor for the tree set.
         You can perform additional setup steps here
-        :param comp: A comparison function over two elements
+        :param comp: A comparison function over two elements, called once per
+        node visited. If None, items are ordered by their keys instead
+        :param items: an iterable of items to load into the set
+        :param key: function giving the sort key of an item, computed once per
+        item and compared with < and ==. Defaults to the item itself
         """
+        if comp is not None and key is not None:
+            raise ValueError('give either comp or key, not both')
         self.comp = comp
+        self.key = key
         self.root = None
         self.length = 0
+        # token marking the nodes this tree may change in place. Nodes with
+        # any other owner are shared with a snapshot and copied before writes
+        self.owner = None
+        if items is not None:
+            self.update(items)
+    def snapshot(self):
+        """
+        Takes a view of the set in O(1). The snapshot shares every
+        node with the set, and from then on each insert or remove copies the
+        O(log n) nodes it changes instead of changing them in place, so
+        readers can iterate the snapshot without locks while writes go on.
+        Take it from the writing thread
+        :return: a TreeSet with the set's current items
+        """
+        view = TreeSet(self.comp, key=self.key)
+        view.root = self.root
+        view.length = self.length
+        # neither tree owns the shared nodes any more, so a write to either
+        # one copies them
+        view.owner = object()
+        self.owner = object()
+        return view
+    def sortKey(self, item):
+        """
+        Gets what the tree compares an item by
+        :param item:
+        :return: the item's key, or the item itself if there's no key function
+        """
+        if self.key is None:
+            return item
+        return self.key(item)
     def __len__(self):
         """
         Counts the number of elements in the tree
@@ -427,8 +542,8 @@ class TreeSet:
         if self.root is None:
             return -1
         else:
-            # call get_height on root node
-            return self.root.get_height()
+            # the root's stored height is the tree's
+            return self.root.height
     def insert(self, item):
         """
         Inserts the item into the tree
@@ -437,11 +552,14 @@ class TreeSet:
         """
         # if tree is empty, set root
         if self.root is None:
-            self.root = TreeNode(item)
+            self.root = TreeNode(item, self.sortKey(item))
+            self.root.owner = self.owner
             self.length += 1
             return True
-        else:
-            return self.root.insert(item, self.comp, self.root, self)
+        # the insert was successful if the tree grew
+        length = self.length
+        self.root = self.root.insert(item, self.sortKey(item), self.comp, self)
+        return self.length > length
     def remove(self, item):
         """
         Removes the item from the tree
@@ -451,13 +569,10 @@ class TreeSet:
         # if tree is empty
         if self.root is None:
             return False
-        # if tree has one node
-        elif self.length == 1 and item == self.root.data:
-            self.root = None
-            self.length = 0
-            return True
-        else:
-            return self.root.delete_node(self.comp, item, self.root, self)
+        # the remove was successful if the tree shrank
+        length = self.length
+        self.root = self.root.delete_node(self.sortKey(item), self.comp, self)
+        return self.length < length
     def __contains__(self, item):
         """
         Checks if the item is in the tree
@@ -468,7 +583,7 @@ class TreeSet:
         if self.root is None:
             return False
         else:
-            return self.root.containsNode(item, self.comp)
+            return self.root.containsNode(self.sortKey(item), self.comp)
     def first(self):
         """
         Finds the minimum item of the tree
@@ -495,6 +610,178 @@ class TreeSet:
             maxNode = self.root.maximum(self.comp)
         # return its data
         return maxNode.data
+    def update(self, items):
+        """
+        Adds every item of an iterable to the set. The items are sorted once
+        (skipped if they already are), deduplicated and merged with the set's
+        own items into a tree built bottom up, in O(n + k log k)
+        :param items: an iterable of items
+        """
+        entries = sorted_entries(items, self.comp, self.key)
+        # a few items are cheaper to insert than rebuilding the whole tree
+        if len(entries) * max(self.length, 1).bit_length() < self.length:
+            for k, item in entries:
+                self.root = self.root.insert(item, k, self.comp, self)
+            return
+        if self.length:
+            entries = list(merge_sorted(self.entries(), entries, self.comp,
+                                        True, True, True))
+        self.root = build_tree(entries, 0, len(entries), self.owner)
+        self.length = len(entries)
+    def fill(self, items):
+        """
+        Replaces the items of the set with ones already in order, building the
+        tree bottom up in O(n)
+        :param items: a list of sorted, distinct items
+        """
+        if self.key is None:
+            entries = list(zip(items, items))
+        else:
+            entries = [(self.key(item), item) for item in items]
+        self.root = build_tree(entries, 0, len(entries), self.owner)
+        self.length = len(entries)
+    def __getstate__(self):
+        """
+        Gets the state to pickle, the items in order rather than the nodes
+        :return: dict of the ordering and the items
+        """
+        return {'comp': self.comp, 'key': self.key, 'items': list(self)}
+    def __setstate__(self, state):
+        """
+        Restores a pickled set, rebuilding a balanced tree from its items
+        :param state: dict made by __getstate__
+        """
+        self.comp = state['comp']
+        self.key = state['key']
+        self.owner = None
+        self.fill(state['items'])
+    def dump(self, path):
+        """
+        Writes the items in order to a compact binary file. Sets of ints,
+        floats or strs are packed into arrays, anything else is pickled
+        :param path: path of the file to write
+        """
+        write_dump(path, list(self))
+    @classmethod
+    def load(cls, path, comp=None, key=None):
+        """
+        Reads a file written by TreeSet.dump, rebuilding a balanced tree from
+        its items in O(n)
+        :param path: path of the file
+        :param comp: the comparison function the set was ordered by
+        :param key: the key function the set was ordered by
+        :return: a TreeSet of the file's items
+        """
+        tree = cls(comp, key=key)
+        tree.fill(read_dump(path))
+        return tree
+    def entries(self):
+        """
+        Iterates over the (sort key, item) pairs of the tree in order
+        :return: An iterator
+        """
+        if self.root is None:
+            return iter([])
+        return ((node.key, node.data) for node in self.root.nodes())
+    def rank(self, item):
+        """
+        Counts the items in the tree that are less than an item
+        :param item: The item to rank, which doesn't have to be in the tree
+        :return: number of items less than item
+        """
+        if self.root is None:
+            return 0
+        return self.root.rank(self.sortKey(item), self.comp)
+    def select(self, k):
+        """
+        Finds the k-th smallest item of the tree
+        :param k: index of the item in sorted order, starting at 0
+        :return: the item
+        """
+        if not 0 <= k < self.length:
+            raise IndexError(k)
+        return self.root.select(k).data
+    def count_range(self, lo, hi):
+        """
+        Counts the items in the range [lo, hi)
+        :param lo: lower bound of the range
+        :param hi: upper bound of the range(items equal to it aren't counted)
+        :return: number of items in the range
+        """
+        return max(0, self.rank(hi) - self.rank(lo))
+    def __getitem__(self, index):
+        """
+        Gets items by their position in sorted order
+        :param index: an index, negative ones counting from the end, or a slice
+        :return: the item, or a list of items for a slice
+        """
+        if isinstance(index, slice):
+            return [self.select(i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        return self.select(index)
+    def floor(self, item):
+        """
+        Finds the greatest item of the tree that is less than or equal to item
+        :param item: The item to compare against
+        :return: the greatest such item, or None if there isn't one
+        """
+        return self.nearest(item, True, True)
+    def lower(self, item):
+        """
+        Finds the greatest item of the tree that is strictly less than item
+        :param item: The item to compare against
+        :return: the greatest such item, or None if there isn't one
+        """
+        return self.nearest(item, True, False)
+    def ceiling(self, item):
+        """
+        Finds the least item of the tree that is greater than or equal to item
+        :param item: The item to compare against
+        :return: the least such item, or None if there isn't one
+        """
+        return self.nearest(item, False, True)
+    def higher(self, item):
+        """
+        Finds the least item of the tree that is strictly greater than item
+        :param item: The item to compare against
+        :return: the least such item, or None if there isn't one
+        """
+        return self.nearest(item, False, False)
+    def nearest(self, item, below, inclusive):
+        """
+        Finds the closest item of the tree to one side of an item
+        :param item: The item to compare against
+        :param below: True to look below item, False to look above it
+        :param inclusive: whether an item equal to item counts
+        :return: the closest such item, or None if there isn't one
+        """
+        if self.root is None:
+            return None
+        if below:
+            node = self.root.floor(self.sortKey(item), self.comp, inclusive)
+        else:
+            node = self.root.ceiling(self.sortKey(item), self.comp, inclusive)
+        return None if node is None else node.data
+    def irange(self, lo=None, hi=None, reverse=False, inclusive=(True, False)):
+        """
+        Lazily iterates over the items in the range [lo, hi) in order, costing
+        O(log n) to start and O(1) amortized per item after that
+        :param lo: lower bound, or None for no lower bound
+        :param hi: upper bound, or None for no upper bound
+        :param reverse: whether to iterate from hi down to lo
+        :param inclusive: pair of bools, whether lo and hi themselves are in
+        the range
+        :return: An iterator
+        """
+        if self.root is None:
+            return iter([])
+        if lo is not None:
+            lo = self.sortKey(lo)
+        if hi is not None:
+            hi = self.sortKey(hi)
+        return map(attrgetter('data'),
+                   self.root.irange(lo, hi, self.comp, reverse, inclusive))
     def clear(self):
         """
         Empties the tree
@@ -515,16 +802,87 @@ class TreeSet:
     def is_disjoint(self, other):
         """
         Check if two TreeSet is disjoint
-        :param other: A TreeSet object
+        :param other: A TreeSet object ordered the same way
         :return: True if the sets have no elements in common
         """
-        # loop through tree
-        for thing in self:
-            # it data matches, it isn't disjoint
-            if other.__contains__(thing):
-                return False
-        # if none of the data matched, return true
+        # any item kept by an intersection means they aren't disjoint
+        for entry in self.overlapping(other, False, True, False):
+            return False
         return True
+    def overlap(self, other):
+        """
+        Finds the range covered by both sets
+        :param other: A TreeSet object ordered the same way
+        :return: (lo, hi) sort keys, both inclusive, or None if the ranges
+        don't overlap
+        """
+        if self.root is None or other.root is None:
+            return None
+        lo = max_by(self.comp, self.root.minimum(self.comp).key,
+                    other.root.minimum(self.comp).key)
+        hi = min_by(self.comp, self.root.maximum(self.comp).key,
+                    other.root.maximum(self.comp).key)
+        if compare(lo, hi, self.comp) > 0:
+            return None
+        return lo, hi
+    def overlapping(self, other, keep_a, keep_both, keep_b):
+        """
+        Merges the entries of two sets within the range covered by both, the
+        only place common items can be
+        :param other: A TreeSet object ordered the same way
+        :param keep_a: whether to keep items only in this set
+        :param keep_both: whether to keep items in both
+        :param keep_b: whether to keep items only in other
+        :return: iterator of the (sort key, item) pairs kept
+        """
+        bounds = self.overlap(other)
+        if bounds is None:
+            return iter([])
+        lo, hi = bounds
+        ours = self.root.irange(lo, hi, self.comp, inclusive=(True, True))
+        theirs = other.root.irange(lo, hi, self.comp, inclusive=(True, True))
+        return merge_sorted(((node.key, node.data) for node in ours),
+                            ((node.key, node.data) for node in theirs),
+                            self.comp, keep_a, keep_both, keep_b)
+    def union(self, other):
+        """
+        Makes a set of the items in either set, by merging their in-order
+        sequences in O(n + m)
+        :param other: A TreeSet object ordered the same way
+        :return: a new TreeSet
+        """
+        return tree_from_sorted(
+            merge_sorted(self.entries(), other.entries(), self.comp,
+                         True, True, True), self.comp, self.key)
+    def intersection(self, other):
+        """
+        Makes a set of the items in both sets, by merging the parts of their
+        in-order sequences that overlap
+        :param other: A TreeSet object ordered the same way
+        :return: a new TreeSet
+        """
+        return tree_from_sorted(self.overlapping(other, False, True, False),
+                                self.comp, self.key)
+    def difference(self, other):
+        """
+        Makes a set of the items in this set but not in other, by merging
+        their in-order sequences in O(n + m)
+        :param other: A TreeSet object ordered the same way
+        :return: a new TreeSet
+        """
+        return tree_from_sorted(
+            merge_sorted(self.entries(), other.entries(), self.comp,
+                         True, False, False), self.comp, self.key)
+    def symmetric_difference(self, other):
+        """
+        Makes a set of the items in exactly one of the sets, by merging their
+        in-order sequences in O(n + m)
+        :param other: A TreeSet object ordered the same way
+        :return: a new TreeSet
+        """
+        return tree_from_sorted(
+            merge_sorted(self.entries(), other.entries(), self.comp,
+                         True, False, True), self.comp, self.key)
     def is_empty(self):
         """
         Determines whether the set is empty
@@ -543,3 +901,1186 @@ class TreeSet:
         :return:
         """
         return not self.is_empty()
+class TreeMap:
+    """
+    An ordered map from keys to values backed by the same balanced tree as
+    TreeSet. Every node holds a key and its value, so each lookup, update and
+    delete is a single descent of the tree
+    """
+    def __init__(self, comp=None, items=None, key=None):
+        """
+        Constructor for the tree map
+        :param comp: A comparison function over two keys, called once per node
+        visited. If None, keys are ordered by key instead
+        :param items: a mapping or iterable of (key, value) pairs to load
+        :param key: function giving the sort key of a map key, computed once
+        per key and compared with < and ==. Defaults to the key itself
+        """
+        if comp is not None and key is not None:
+            raise ValueError('give either comp or key, not both')
+        self.comp = comp
+        self.key = key
+        self.root = None
+        self.length = 0
+        if items is not None:
+            self.update(items)
+    def sortKey(self, key):
+        """
+        Gets what the tree compares a key by
+        :param key:
+        :return: the sort key, or the key itself if there's no key function
+        """
+        if self.key is None:
+            return key
+        return self.key(key)
+    def __len__(self):
+        """
+        Counts the number of pairs in the map
+        :return: length of map
+        """
+        return self.length
+    def height(self):
+        """
+        Finds the height of the tree
+        :return: height of tree
+        """
+        if self.root is None:
+            return -1
+        return self.root.height
+    def find(self, key):
+        """
+        Finds the node holding a key
+        :param key: The key we're looking for
+        :return: the node, or None if key isn't in the map
+        """
+        if self.root is None:
+            return None
+        return self.root.locate(self.sortKey(key), self.comp)[0]
+    def get(self, key, default=None):
+        """
+        Gets the value of a key
+        :param key: The key we're looking for
+        :param default: value given if the key isn't in the map
+        :return: the key's value, or default
+        """
+        node = self.find(key)
+        return default if node is None else node.value
+    def __getitem__(self, key):
+        """
+        Gets the value of a key. If key is not in the map, a KeyError is raised
+        :param key: The key we're looking for
+        :return: the key's value
+        """
+        node = self.find(key)
+        if node is None:
+            raise KeyError(key)
+        return node.value
+    def __contains__(self, key):
+        """
+        Checks if a key is in the map
+        :param key:
+        :return: True if the key is in the map
+        """
+        return self.find(key) is not None
+    def put(self, key, value):
+        """
+        Sets the value of a key, adding the key if it's new
+        :param key: key for the pair
+        :param value: value associated with key
+        :return: True if the key was added, False if its value was replaced
+        """
+        k = self.sortKey(key)
+        if self.root is None:
+            self.root = TreeNode(key, k, value)
+            self.length = 1
+            return True
+        # nodes from the root down to the new node's parent
+        path = []
+        node, c = self.root.locate(k, self.comp, path)
+        if node is not None:
+            node.value = value
+            return False
+        # the search fell off the side of the parent the key goes on
+        if c < 0:
+            path[-1].left = TreeNode(key, k, value)
+        else:
+            path[-1].right = TreeNode(key, k, value)
+        self.length += 1
+        self.root = rebalance_path(path)
+        return True
+    def __setitem__(self, key, value):
+        """
+        Sets the value of a key
+        :param key: key for the pair
+        :param value: value associated with key
+        """
+        self.put(key, value)
+    def pop(self, key, default=MISSING):
+        """
+        Removes a key from the map
+        :param key: the key to remove
+        :param default: value given if the key isn't in the map. If it isn't
+        given, a KeyError is raised instead
+        :return: the key's value, or default
+        """
+        if self.root is None:
+            node = None
+        else:
+            # nodes from the root down to the parent of the key's node
+            path = []
+            node = self.root.locate(self.sortKey(key), self.comp, path)[0]
+        if node is None:
+            if default is MISSING:
+                raise KeyError(key)
+            return default
+        value = node.value
+        self.length -= 1
+        self.root = unlink_node(node, path)
+        return value
+    def __delitem__(self, key):
+        """
+        Deletes a key from the map. If key is not in the map, a KeyError is
+        raised
+        :param key: the key to delete
+        """
+        self.pop(key)
+    def update(self, other):
+        """
+        Sets every pair from other in the map. The pairs are sorted once
+        (skipped if they already are) and merged with the map's own into a
+        tree built bottom up, in O(n + k log k). A later pair for a key
+        replaces an earlier one
+        :param other: a mapping, HashMap or iterable of (key, value) pairs
+        """
+        pairs = other.items() if hasattr(other, 'items') else other
+        if self.key is None:
+            entries = [(key, key, value) for key, value in pairs]
+        else:
+            entries = [(self.key(key), key, value) for key, value in pairs]
+        # a stable sort keeps equal keys in the order they were given
+        if self.comp is None:
+            entries.sort(key=itemgetter(0))
+        else:
+            sort_key = cmp_to_key(self.comp)
+            entries.sort(key=lambda entry: sort_key(entry[0]))
+        # keep the last pair given for each key
+        distinct = []
+        for entry in entries:
+            if distinct and compare(distinct[-1][0], entry[0], self.comp) == 0:
+                distinct[-1] = entry
+            else:
+                distinct.append(entry)
+        # a few pairs are cheaper to put than rebuilding the whole tree
+        if len(distinct) * max(self.length, 1).bit_length() < self.length:
+            for k, key, value in distinct:
+                self.put(key, value)
+            return
+        # merging keeps the new pair when both have a key
+        if self.length:
+            distinct = list(merge_sorted(distinct, self.entries(), self.comp,
+                                         True, True, True))
+        self.root = build_tree(distinct, 0, len(distinct))
+        self.length = len(distinct)
+    def __getstate__(self):
+        """
+        Gets the state to pickle, the pairs in key order rather than the nodes
+        :return: dict of the ordering, keys and values
+        """
+        return {'comp': self.comp, 'key': self.key, 'keys': list(self.keys()),
+                'values': list(self.values())}
+    def __setstate__(self, state):
+        """
+        Restores a pickled map, rebuilding a balanced tree from its pairs
+        :param state: dict made by __getstate__
+        """
+        self.comp = state['comp']
+        self.key = state['key']
+        keys = state['keys']
+        sort_keys = keys if self.key is None else map(self.key, keys)
+        entries = list(zip(sort_keys, keys, state['values']))
+        self.root = build_tree(entries, 0, len(entries))
+        self.length = len(entries)
+    def entries(self):
+        """
+        Iterates over the (sort key, key, value) triples of the map in order
+        :return: An iterator
+        """
+        if self.root is None:
+            return iter([])
+        return ((node.key, node.data, node.value) for node in self.root.nodes())
+    def first_item(self):
+        """
+        Finds the pair with the least key
+        :return: (key, value)
+        """
+        if self.root is None:
+            raise KeyError
+        node = self.root.minimum(self.comp)
+        return node.data, node.value
+    def last_item(self):
+        """
+        Finds the pair with the greatest key
+        :return: (key, value)
+        """
+        if self.root is None:
+            raise KeyError
+        node = self.root.maximum(self.comp)
+        return node.data, node.value
+    def floor_item(self, key):
+        """
+        Finds the pair with the greatest key less than or equal to key
+        :param key: The key to compare against
+        :return: (key, value), or None if there isn't one
+        """
+        return self.nearest(key, True, True)
+    def lower_item(self, key):
+        """
+        Finds the pair with the greatest key strictly less than key
+        :param key: The key to compare against
+        :return: (key, value), or None if there isn't one
+        """
+        return self.nearest(key, True, False)
+    def ceiling_item(self, key):
+        """
+        Finds the pair with the least key greater than or equal to key
+        :param key: The key to compare against
+        :return: (key, value), or None if there isn't one
+        """
+        return self.nearest(key, False, True)
+    def higher_item(self, key):
+        """
+        Finds the pair with the least key strictly greater than key
+        :param key: The key to compare against
+        :return: (key, value), or None if there isn't one
+        """
+        return self.nearest(key, False, False)
+    def nearest(self, key, below, inclusive):
+        """
+        Finds the pair whose key is closest to one side of a key
+        :param key: The key to compare against
+        :param below: True to look below key, False to look above it
+        :param inclusive: whether a key equal to key counts
+        :return: (key, value), or None if there isn't one
+        """
+        if self.root is None:
+            return None
+        if below:
+            node = self.root.floor(self.sortKey(key), self.comp, inclusive)
+        else:
+            node = self.root.ceiling(self.sortKey(key), self.comp, inclusive)
+        return None if node is None else (node.data, node.value)
+    def nodeRange(self, lo, hi, reverse, inclusive):
+        """
+        Lazily iterates over the nodes whose keys are in a range
+        :return: An iterator
+        """
+        if self.root is None:
+            return iter([])
+        if lo is not None:
+            lo = self.sortKey(lo)
+        if hi is not None:
+            hi = self.sortKey(hi)
+        return self.root.irange(lo, hi, self.comp, reverse, inclusive)
+    def irange_items(self, lo=None, hi=None, reverse=False,
+                     inclusive=(True, False)):
+        """
+        Lazily iterates over the pairs whose keys are in the range [lo, hi) in
+        order, costing O(log n) to start and O(1) amortized per pair after that
+        :param lo: lower bound, or None for no lower bound
+        :param hi: upper bound, or None for no upper bound
+        :param reverse: whether to iterate from hi down to lo
+        :param inclusive: pair of bools, whether lo and hi themselves are in
+        the range
+        :return: An iterator of (key, value) pairs
+        """
+        return ((node.data, node.value)
+                for node in self.nodeRange(lo, hi, reverse, inclusive))
+    def irange(self, lo=None, hi=None, reverse=False, inclusive=(True, False)):
+        """
+        Lazily iterates over the keys in the range [lo, hi) in order
+        :param lo: lower bound, or None for no lower bound
+        :param hi: upper bound, or None for no upper bound
+        :param reverse: whether to iterate from hi down to lo
+        :param inclusive: pair of bools, whether lo and hi themselves are in
+        the range
+        :return: An iterator
+        """
+        return map(attrgetter('data'),
+                   self.nodeRange(lo, hi, reverse, inclusive))
+    def keys(self):
+        """
+        Iterates over the keys in order
+        :return: An iterator
+        """
+        return self.irange()
+    def values(self):
+        """
+        Iterates over the values in key order
+        :return: An iterator
+        """
+        return map(attrgetter('value'), self.nodeRange(None, None, False,
+                                                       (True, False)))
+    def items(self):
+        """
+        Iterates over the (key, value) pairs in key order
+        :return: An iterator
+        """
+        return self.irange_items()
+    def __iter__(self):
+        """
+        Iterates through the map in key order, yielding (key, value) pairs
+        """
+        return self.irange_items()
+    def clear(self):
+        """
+        Empties the map
+        """
+        self.root = None
+        self.length = 0
+    def is_empty(self):
+        """
+        Determines whether the map is empty
+        :return: True if the map contains no pairs
+        """
+        return self.length == 0
+    def __repr__(self):
+        """
+        A string representation of this map in key order
+        :return: A string representing this map
+        """
+        return 'TreeMap({{{0}}})'.format(
+            ','.join('{0}:{1}'.format(k, v) for k, v in self))
+    def __bool__(self):
+        """
+        Checks if there are pairs in the map
+        :return True if the map is non-empty
+        """
+        return not self.is_empty()
+class SortedListSet:
+    """
+    A set with the same interface as TreeSet, kept as a list of sorted blocks
+    of items instead of one node per item. A block is found by bisecting the
+    greatest key of every block, then searched with bisect, so an item costs
+    a slot in a list rather than a TreeNode, and iteration walks contiguous
+    lists. Blocks split when they grow past 2 * BLOCK_SIZE items.
+    With a comparison function the sort keys are cmp_to_key wrappers, so
+    every ordering compares keys natively inside the set
+    """
+    def __init__(self, comp=None, items=None, key=None):
+        """
+        Constructor for the set
+        :param comp: A comparison function over two elements. If None, items
+        are ordered by their keys instead
+        :param items: an iterable of items to load into the set
+        :param key: function giving the sort key of an item, computed once per
+        item. Defaults to the item itself
+        """
+        if comp is not None and key is not None:
+            raise ValueError('give either comp or key, not both')
+        self.comp = comp
+        self.key = key
+        # what sort keys are computed with, None when items are their own
+        self.keyOf = cmp_to_key(comp) if comp is not None else key
+        # blocks of sort keys and of items, where an item's block and index
+        # are the same as its key's. Items that are their own keys share the
+        # key blocks
+        self.keys = []
+        self.items = []
+        # the greatest key of each block
+        self.maxes = []
+        # number of items before each block, rebuilt when it's needed again
+        # after the blocks change
+        self.offsets = None
+        self.length = 0
+        if items is not None:
+            self.update(items)
+    def sortKey(self, item):
+        """
+        Gets what the set compares an item by
+        :param item:
+        :return: the item's key, or the item itself if there's no key function
+        """
+        if self.keyOf is None:
+            return item
+        return self.keyOf(item)
+    def __len__(self):
+        """
+        Counts the number of elements in the set
+        :return: length of set
+        """
+        return self.length
+    def height(self):
+        """
+        Finds the height of the set, seen as a tree whose root is the list of
+        blocks
+        :return: -1 if the set is empty, otherwise 1
+        """
+        return -1 if self.length == 0 else 1
+    def locate(self, k, right=False):
+        """
+        Finds the position of the first item not less than a sort key
+        :param k: the sort key
+        :param right: whether to find the first item greater than k instead
+        :return: (block, index), or (number of blocks, 0) past the last item
+        """
+        find = bisect_right if right else bisect_left
+        i = find(self.maxes, k)
+        if i == len(self.maxes):
+            return i, 0
+        return i, find(self.keys[i], k)
+    def insert(self, item):
+        """
+        Inserts the item into the set
+        :param item:
+        :return: If the operation was successful
+        """
+        return self.insertKey(self.sortKey(item), item)
+    def insertKey(self, k, item):
+        """
+        Inserts an item under its sort key
+        :param k: the item's sort key
+        :param item:
+        :return: If the operation was successful
+        """
+        if not self.keys:
+            self.keys.append([k])
+            self.items.append(self.keys[0] if self.keyOf is None else [item])
+            self.maxes.append(k)
+            self.length = 1
+            self.offsets = None
+            return True
+        i, j = self.locate(k)
+        # past every item, it goes at the end of the last block
+        if i == len(self.keys):
+            i -= 1
+            j = len(self.keys[i])
+            self.maxes[i] = k
+        elif self.keys[i][j] == k:
+            return False
+        keys = self.keys[i]
+        keys.insert(j, k)
+        if self.items[i] is not keys:
+            self.items[i].insert(j, item)
+        self.length += 1
+        self.offsets = None
+        if len(keys) > 2 * BLOCK_SIZE:
+            self.split(i)
+        return True
+    def split(self, i):
+        """
+        Splits a block into two halves
+        :param i: index of the block
+        """
+        keys = self.keys[i]
+        items = self.items[i]
+        half = len(keys) // 2
+        self.keys.insert(i + 1, keys[half:])
+        if items is keys:
+            self.items.insert(i + 1, self.keys[i + 1])
+        else:
+            self.items.insert(i + 1, items[half:])
+            del items[half:]
+        del keys[half:]
+        # the old greatest key is now the second block's
+        self.maxes.insert(i, keys[-1])
+    def remove(self, item):
+        """
+        Removes the item from the set
+        :param item:
+        :return: If the operation was successful
+        """
+        k = self.sortKey(item)
+        i, j = self.locate(k)
+        if i == len(self.keys) or self.keys[i][j] != k:
+            return False
+        keys = self.keys[i]
+        del keys[j]
+        if self.items[i] is not keys:
+            del self.items[i][j]
+        self.length -= 1
+        self.offsets = None
+        if not keys:
+            del self.keys[i]
+            del self.items[i]
+            del self.maxes[i]
+        else:
+            self.maxes[i] = keys[-1]
+            # a block that shrank too far is joined to a neighbour
+            if len(keys) < BLOCK_SIZE // 2 and len(self.keys) > 1:
+                self.join(i if i + 1 < len(self.keys) else i - 1)
+        return True
+    def join(self, i):
+        """
+        Joins a block and the one after it, splitting them again if the
+        result is too big
+        :param i: index of the first block
+        """
+        keys = self.keys[i]
+        items = self.items[i]
+        keys.extend(self.keys[i + 1])
+        if items is not keys:
+            items.extend(self.items[i + 1])
+        del self.keys[i + 1]
+        del self.items[i + 1]
+        del self.maxes[i]
+        if len(keys) > 2 * BLOCK_SIZE:
+            self.split(i)
+    def __contains__(self, item):
+        """
+        Checks if the item is in the set
+        :param item:
+        :return: if the item was in the set
+        """
+        k = self.sortKey(item)
+        i, j = self.locate(k)
+        return i < len(self.keys) and self.keys[i][j] == k
+    def first(self):
+        """
+        Finds the minimum item of the set
+        :return:
+        """
+        if not self.items:
+            raise KeyError
+        return self.items[0][0]
+    def last(self):
+        """
+        Finds the maximum item of the set
+        :return:
+        """
+        if not self.items:
+            raise KeyError
+        return self.items[-1][-1]
+    def update(self, items):
+        """
+        Adds every item of an iterable to the set. The items are sorted once
+        (skipped if they already are), deduplicated and merged with the set's
+        own items into new blocks, in O(n + k log k)
+        :param items: an iterable of items
+        """
+        entries = sorted_entries(items, None, self.keyOf)
+        # a few items are cheaper to insert than rebuilding every block
+        if len(entries) * max(self.length, 1).bit_length() < self.length:
+            for k, item in entries:
+                self.insertKey(k, item)
+            return
+        if self.length:
+            entries = list(merge_sorted(self.entries(), entries, None,
+                                        True, True, True))
+        self.fillEntries(entries)
+    def fill(self, items):
+        """
+        Replaces the items of the set with ones already in order, cutting them
+        into blocks in O(n)
+        :param items: a list of sorted, distinct items
+        """
+        if self.keyOf is None:
+            self.fillEntries(list(zip(items, items)))
+        else:
+            self.fillEntries([(self.keyOf(item), item) for item in items])
+    def fillEntries(self, entries):
+        """
+        Replaces the contents of the set
+        :param entries: a sorted list of distinct (sort key, item) pairs
+        """
+        keys = [k for k, item in entries]
+        self.keys = [keys[i:i + BLOCK_SIZE]
+                     for i in range(0, len(keys), BLOCK_SIZE)]
+        if self.keyOf is None:
+            self.items = list(self.keys)
+        else:
+            items = [item for k, item in entries]
+            self.items = [items[i:i + BLOCK_SIZE]
+                          for i in range(0, len(items), BLOCK_SIZE)]
+        self.maxes = [block[-1] for block in self.keys]
+        self.length = len(keys)
+        self.offsets = None
+    def dump(self, path):
+        """
+        Writes the items in order to a compact binary file, in the same format
+        as TreeSet.dump
+        :param path: path of the file to write
+        """
+        write_dump(path, list(self))
+    @classmethod
+    def load(cls, path, comp=None, key=None):
+        """
+        Reads a file written by SortedListSet.dump or TreeSet.dump, cutting
+        its items into blocks in O(n)
+        :param path: path of the file
+        :param comp: the comparison function the set was ordered by
+        :param key: the key function the set was ordered by
+        :return: a SortedListSet of the file's items
+        """
+        sorted_set = cls(comp, key=key)
+        sorted_set.fill(read_dump(path))
+        return sorted_set
+    def entries(self):
+        """
+        Iterates over the (sort key, item) pairs of the set in order
+        :return: An iterator
+        """
+        return chain.from_iterable(map(zip, self.keys, self.items))
+    def like(self, entries):
+        """
+        Makes a set ordered the same way as this one
+        :param entries: an iterable of sorted, distinct (sort key, item) pairs
+        :return: a new SortedListSet of the items
+        """
+        other = SortedListSet(self.comp, key=self.key)
+        other.fillEntries(list(entries))
+        return other
+    def positions(self):
+        """
+        Gets the number of items before each block, and in every block at the
+        end
+        :return: list of counts
+        """
+        if self.offsets is None:
+            self.offsets = [0]
+            self.offsets.extend(accumulate(map(len, self.keys)))
+        return self.offsets
+    def rank(self, item):
+        """
+        Counts the items in the set that are less than an item
+        :param item: The item to rank, which doesn't have to be in the set
+        :return: number of items less than item
+        """
+        i, j = self.locate(self.sortKey(item))
+        return self.positions()[i] + j
+    def select(self, k):
+        """
+        Finds the k-th smallest item of the set
+        :param k: index of the item in sorted order, starting at 0
+        :return: the item
+        """
+        if not 0 <= k < self.length:
+            raise IndexError(k)
+        offsets = self.positions()
+        i = bisect_right(offsets, k) - 1
+        return self.items[i][k - offsets[i]]
+    def count_range(self, lo, hi):
+        """
+        Counts the items in the range [lo, hi)
+        :param lo: lower bound of the range
+        :param hi: upper bound of the range(items equal to it aren't counted)
+        :return: number of items in the range
+        """
+        return max(0, self.rank(hi) - self.rank(lo))
+    def __getitem__(self, index):
+        """
+        Gets items by their position in sorted order
+        :param index: an index, negative ones counting from the end, or a slice
+        :return: the item, or a list of items for a slice
+        """
+        if isinstance(index, slice):
+            return [self.select(i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        return self.select(index)
+    def floor(self, item):
+        """
+        Finds the greatest item of the set that is less than or equal to item
+        :param item: The item to compare against
+        :return: the greatest such item, or None if there isn't one
+        """
+        return self.nearest(item, True, True)
+    def lower(self, item):
+        """
+        Finds the greatest item of the set that is strictly less than item
+        :param item: The item to compare against
+        :return: the greatest such item, or None if there isn't one
+        """
+        return self.nearest(item, True, False)
+    def ceiling(self, item):
+        """
+        Finds the least item of the set that is greater than or equal to item
+        :param item: The item to compare against
+        :return: the least such item, or None if there isn't one
+        """
+        return self.nearest(item, False, True)
+    def higher(self, item):
+        """
+        Finds the least item of the set that is strictly greater than item
+        :param item: The item to compare against
+        :return: the least such item, or None if there isn't one
+        """
+        return self.nearest(item, False, False)
+    def nearest(self, item, below, inclusive):
+        """
+        Finds the closest item of the set to one side of an item
+        :param item: The item to compare against
+        :param below: True to look below item, False to look above it
+        :param inclusive: whether an item equal to item counts
+        :return: the closest such item, or None if there isn't one
+        """
+        # the closest item below is just before the first one that's too big
+        i, j = self.locate(self.sortKey(item), below == inclusive)
+        if not below:
+            return None if i == len(self.items) else self.items[i][j]
+        if j > 0:
+            return self.items[i][j - 1]
+        if i > 0:
+            return self.items[i - 1][-1]
+        return None
+    def irange(self, lo=None, hi=None, reverse=False, inclusive=(True, False)):
+        """
+        Lazily iterates over the items in the range [lo, hi) in order, costing
+        O(log n) to start and O(1) amortized per item after that
+        :param lo: lower bound, or None for no lower bound
+        :param hi: upper bound, or None for no upper bound
+        :param reverse: whether to iterate from hi down to lo
+        :param inclusive: pair of bools, whether lo and hi themselves are in
+        the range
+        :return: An iterator
+        """
+        start = (0, 0)
+        stop = (len(self.items), 0)
+        if lo is not None:
+            start = self.locate(self.sortKey(lo), not inclusive[0])
+        if hi is not None:
+            stop = self.locate(self.sortKey(hi), inclusive[1])
+        return walk(self.items, start, stop, reverse)
+    def clear(self):
+        """
+        Empties the set
+        :return:
+        """
+        self.keys = []
+        self.items = []
+        self.maxes = []
+        self.offsets = None
+        self.length = 0
+    def __iter__(self):
+        """
+        Iterates over the items in order
+        :return:
+        """
+        return chain.from_iterable(self.items)
+    def is_disjoint(self, other):
+        """
+        Check if two sets are disjoint
+        :param other: A SortedListSet object ordered the same way
+        :return: True if the sets have no elements in common
+        """
+        # any item kept by an intersection means they aren't disjoint
+        for entry in self.overlapping(other, False, True, False):
+            return False
+        return True
+    def overlap(self, other):
+        """
+        Finds the range covered by both sets
+        :param other: A SortedListSet object ordered the same way
+        :return: (lo, hi) sort keys, both inclusive, or None if the ranges
+        don't overlap
+        """
+        if not self.keys or not other.keys:
+            return None
+        lo = max(self.keys[0][0], other.keys[0][0])
+        hi = min(self.maxes[-1], other.maxes[-1])
+        if lo > hi:
+            return None
+        return lo, hi
+    def span(self, lo, hi):
+        """
+        Iterates over the (sort key, item) pairs between two sort keys, both
+        inclusive
+        :return: An iterator
+        """
+        start = self.locate(lo)
+        stop = self.locate(hi, True)
+        return zip(walk(self.keys, start, stop, False),
+                   walk(self.items, start, stop, False))
+    def overlapping(self, other, keep_a, keep_both, keep_b):
+        """
+        Merges the entries of two sets within the range covered by both, the
+        only place common items can be
+        :param other: A SortedListSet object ordered the same way
+        :param keep_a: whether to keep items only in this set
+        :param keep_both: whether to keep items in both
+        :param keep_b: whether to keep items only in other
+        :return: iterator of the (sort key, item) pairs kept
+        """
+        bounds = self.overlap(other)
+        if bounds is None:
+            return iter([])
+        return merge_sorted(self.span(*bounds), other.span(*bounds), None,
+                            keep_a, keep_both, keep_b)
+    def union(self, other):
+        """
+        Makes a set of the items in either set, by merging their blocks in
+        O(n + m)
+        :param other: A SortedListSet object ordered the same way
+        :return: a new SortedListSet
+        """
+        return self.like(merge_sorted(self.entries(), other.entries(), None,
+                                      True, True, True))
+    def intersection(self, other):
+        """
+        Makes a set of the items in both sets, by merging the parts of their
+        blocks that overlap
+        :param other: A SortedListSet object ordered the same way
+        :return: a new SortedListSet
+        """
+        return self.like(self.overlapping(other, False, True, False))
+    def difference(self, other):
+        """
+        Makes a set of the items in this set but not in other, by merging
+        their blocks in O(n + m)
+        :param other: A SortedListSet object ordered the same way
+        :return: a new SortedListSet
+        """
+        return self.like(merge_sorted(self.entries(), other.entries(), None,
+                                      True, False, False))
+    def symmetric_difference(self, other):
+        """
+        Makes a set of the items in exactly one of the sets, by merging their
+        blocks in O(n + m)
+        :param other: A SortedListSet object ordered the same way
+        :return: a new SortedListSet
+        """
+        return self.like(merge_sorted(self.entries(), other.entries(), None,
+                                      True, False, True))
+    def is_empty(self):
+        """
+        Determines whether the set is empty
+        :return: False if the set contains no items, True otherwise
+        """
+        return len(self) == 0
+    def __repr__(self):
+        """
+        Creates a string representation of this set in order
+        :return: A string representing this set
+        """
+        return 'SortedListSet([{0}])'.format(','.join(str(item) for item in self))
+    def __bool__(self):
+        """
+        Checks if the set is non-empty
+        :return:
+        """
+        return not self.is_empty()
+def rebalance_path(path, owner=None):
+    """
+    Rebalances the nodes along a path from the top down to some node, bottom
+    up, linking each rebalanced subtree back into the node above it
+    :param path: list of nodes where each one is a child of the one before
+    :param owner: the tree owning the nodes on the path
+    :return: root of the first node's subtree after rebalancing
+    """
+    new_node = None
+    for i in range(len(path) - 1, -1, -1):
+        node = path[i]
+        new_node = node.rebalance(owner)
+        # a rotation replaced node, so its parent has to point at new_node
+        if i > 0 and new_node is not node:
+            if path[i - 1].left is node:
+                path[i - 1].left = new_node
+            else:
+                path[i - 1].right = new_node
+    return new_node
+def unlink_node(node, path, owner=None):
+    """
+    Takes a node out of a tree, rebalancing the path back up to its top
+    :param node: the node to take out
+    :param path: list of the nodes from the top of the tree down to node's
+    parent, where each one is a child of the one before
+    :param owner: the tree the nodes are taken out of
+    :return: root of the tree after the delete
+    """
+    # with two children, the least successor's item moves up here and
+    # the successor is removed from the right subtree instead
+    if node.left is not None and node.right is not None:
+        found = len(path)
+        path.append(node)
+        successor = node.right
+        while successor.left is not None:
+            path.append(successor)
+            successor = successor.left
+        thaw_path(path, owner)
+        node = path[found]
+        node.data = successor.data
+        node.key = successor.key
+        node.value = successor.value
+        node = successor
+    else:
+        thaw_path(path, owner)
+    # with at most one child, that child takes the node's place
+    replacement = node.left if node.left is not None else node.right
+    if not path:
+        return replacement
+    if path[-1].left is node:
+        path[-1].left = replacement
+    else:
+        path[-1].right = replacement
+    return rebalance_path(path, owner)
+def thaw(node, owner):
+    """
+    Gets a version of a node that its owner may change in place
+    :param node:
+    :param owner: the tree about to change the node
+    :return: the node if the tree owns it, otherwise a copy the tree owns
+    """
+    if node.owner is owner:
+        return node
+    return node.copy(owner)
+def thaw_path(path, owner):
+    """
+    Replaces the nodes of a path that belong to another tree with copies,
+    linking each copy into the node above it. The first node's parent, if it
+    has one, has to be relinked by the caller
+    :param path: list of nodes where each one is a child of the one before
+    :param owner: the tree about to change the nodes
+    """
+    for i, node in enumerate(path):
+        if node.owner is not owner:
+            path[i] = node.copy(owner)
+            if i > 0:
+                if path[i - 1].left is node:
+                    path[i - 1].left = path[i]
+                else:
+                    path[i - 1].right = path[i]
+def build_tree(entries, start, end, owner=None):
+    """
+    Builds a perfectly balanced tree bottom up from sorted, distinct entries
+    :param entries: a sorted list of (sort key, item) pairs, or of (sort key,
+    key, value) triples for a TreeMap
+    :param start: index of the first entry of the tree
+    :param end: index after the last entry of the tree
+    :param owner: the tree the nodes belong to
+    :return: root node of the tree, or None if the range is empty
+    """
+    if start >= end:
+        return None
+    # the middle entry is the root, each half becomes one of its subtrees
+    mid = (start + end) // 2
+    entry = entries[mid]
+    node = TreeNode(entry[1], entry[0], *entry[2:])
+    node.owner = owner
+    # leaves are most of the nodes, so empty halves aren't recursed into
+    if mid > start:
+        node.left = build_tree(entries, start, mid, owner)
+    if end > mid + 1:
+        node.right = build_tree(entries, mid + 1, end, owner)
+    # a subtree of n nodes built this way has height floor(log2(n)), and the
+    # left half is never smaller than the right
+    node.size = end - start
+    node.height = node.size.bit_length() - 1
+    node.balance = (mid - start).bit_length() - (end - mid - 1).bit_length()
+    return node
+def tree_from_sorted(entries, comp, key=None):
+    """
+    Makes a TreeSet from entries already in sorted order without duplicates
+    :param entries: an iterable of sorted, distinct (sort key, item) pairs
+    :param comp: the comparison function they are sorted by, or None
+    :param key: the key function the sort keys came from, or None
+    :return: a TreeSet of the items
+    """
+    entries = list(entries)
+    tree = TreeSet(comp, key=key)
+    tree.root = build_tree(entries, 0, len(entries))
+    tree.length = len(entries)
+    return tree
+def sorted_entries(items, comp, key):
+    """
+    Pairs items with their sort keys, sorts them and drops duplicates, keeping
+    the first of each group of equal items
+    :param items: an iterable of items
+    :param comp: a comparison function, or None to compare keys natively
+    :param key: function giving the sort key of an item, or None to use the
+    item itself
+    :return: a sorted list of distinct (sort key, item) pairs
+    """
+    if key is None:
+        entries = [(item, item) for item in items]
+    else:
+        entries = [(key(item), item) for item in items]
+    # one pass tells whether the sort can be skipped, and a stable sort keeps
+    # equal items in their original order
+    if comp is None:
+        if any(entries[i][0] < entries[i - 1][0]
+               for i in range(1, len(entries))):
+            entries.sort(key=itemgetter(0))
+    elif any(comp(entries[i - 1][0], entries[i][0]) > 0
+             for i in range(1, len(entries))):
+        sort_key = cmp_to_key(comp)
+        entries.sort(key=lambda entry: sort_key(entry[0]))
+    distinct = entries[:1]
+    for entry in islice(entries, 1, None):
+        if compare(distinct[-1][0], entry[0], comp) != 0:
+            distinct.append(entry)
+    return distinct
+def merge_sorted(a, b, comp, keep_a, keep_both, keep_b):
+    """
+    Merges two sorted sequences of distinct (sort key, item) pairs, yielding
+    the pairs that a set operation keeps
+    :param a: first sorted iterable
+    :param b: second sorted iterable
+    :param comp: the comparison function both are sorted by, or None to
+    compare keys natively
+    :param keep_a: whether to keep pairs only in a
+    :param keep_both: whether to keep pairs in both
+    :param keep_b: whether to keep pairs only in b
+    """
+    a = iter(a)
+    b = iter(b)
+    # DONE stands in for the next pair of a sequence that ran out
+    x = next(a, DONE)
+    y = next(b, DONE)
+    while x is not DONE and y is not DONE:
+        c = compare(x[0], y[0], comp)
+        if c < 0:
+            if keep_a:
+                yield x
+            x = next(a, DONE)
+        elif c > 0:
+            if keep_b:
+                yield y
+            y = next(b, DONE)
+        else:
+            if keep_both:
+                yield x
+            x = next(a, DONE)
+            y = next(b, DONE)
+    # whatever is left is only in one of the sequences
+    if keep_a and x is not DONE:
+        yield x
+        yield from a
+    if keep_b and y is not DONE:
+        yield y
+        yield from b
+def walk(blocks, start, stop, reverse):
+    """
+    Iterates over the entries of a list of blocks between two positions
+    :param blocks: list of lists
+    :param start: (block, index) of the first entry
+    :param stop: (block, index) just past the last entry
+    :param reverse: whether to iterate from stop back to start
+    """
+    i, j = start
+    si, sj = stop
+    if start >= stop:
+        return
+    if not reverse:
+        while i < si:
+            yield from islice(blocks[i], j, None)
+            i += 1
+            j = 0
+        if sj:
+            yield from islice(blocks[si], j, sj)
+        return
+    while si > i:
+        if sj:
+            yield from reversed(blocks[si][:sj])
+        si -= 1
+        sj = len(blocks[si])
+    yield from reversed(blocks[i][j:sj])
+def write_dump(path, items):
+    """
+    Writes items to a file in the format read by read_dump
+    :param path: path of the file to write
+    :param items: a list of items, in order
+    """
+    kind, data = pack_items(items)
+    with open(path, 'wb') as f:
+        f.write(DUMP_HEADER.pack(DUMP_MAGIC, kind, len(items)))
+        f.write(data)
+def read_dump(path):
+    """
+    Reads the items of a file written by write_dump
+    :param path: path of the file
+    :return: list of the items, in the order they were written
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, kind, count = DUMP_HEADER.unpack_from(data, 0)
+    if magic != DUMP_MAGIC:
+        raise ValueError('{0} is not a TreeSet dump'.format(path))
+    return unpack_items(kind, count, memoryview(data)[DUMP_HEADER.size:])
+def pack_items(items):
+    """
+    Packs a list of items into bytes, as compactly as their types allow
+    :param items: a list of items
+    :return: (DUMP_ type the items were packed as, bytes)
+    """
+    kind = DUMP_PICKLE
+    if all(type(item) is int for item in items):
+        kind = DUMP_INT
+    elif all(type(item) is float for item in items):
+        kind = DUMP_FLOAT
+    elif all(type(item) is str for item in items):
+        kind = DUMP_STR
+    try:
+        if kind == DUMP_INT:
+            return kind, little_endian(array('q', items))
+    # ints past 64 bits fall back to a pickle
+    except OverflowError:
+        kind = DUMP_PICKLE
+    if kind == DUMP_FLOAT:
+        return kind, little_endian(array('d', items))
+    if kind == DUMP_STR:
+        lengths = little_endian(array('q', map(len, items)))
+        return kind, lengths + ''.join(items).encode('utf-8', 'surrogatepass')
+    return kind, pickle.dumps(items, pickle.HIGHEST_PROTOCOL)
+def unpack_items(kind, count, data):
+    """
+    Unpacks items packed by pack_items
+    :param kind: the DUMP_ type they were packed as
+    :param count: number of items
+    :param data: the packed bytes
+    :return: list of the items
+    """
+    if kind == DUMP_PICKLE:
+        return pickle.loads(data)
+    if kind == DUMP_FLOAT:
+        return from_little_endian('d', data[:count * 8]).tolist()
+    numbers = from_little_endian('q', data[:count * 8])
+    if kind == DUMP_INT:
+        return numbers.tolist()
+    # strs are cut back out of their joined text by length
+    text = bytes(data[count * 8:]).decode('utf-8', 'surrogatepass')
+    ends = list(accumulate(numbers))
+    return [text[end - length:end] for end, length in zip(ends, numbers)]
+def little_endian(numbers):
+    """
+    Gets the bytes of an array in little-endian order
+    :param numbers: an array
+    :return: bytes
+    """
+    if sys.byteorder != 'little':
+        numbers.byteswap()
+    return numbers.tobytes()
+def from_little_endian(typecode, data):
+    """
+    Reads an array from little-endian bytes
+    :param typecode: the array's typecode
+    :param data: bytes of the array
+    :return: the array
+    """
+    numbers = array(typecode)
+    numbers.frombytes(data)
+    if sys.byteorder != 'little':
+        numbers.byteswap()
+    return numbers
+def compare(x, y, comp):
+    """
+    Compares two sort keys
+    :param comp: a comparison function, or None to compare keys natively
+    :return: negative, zero or positive as x is less than, equal to or greater
+    than y
+    """
+    if comp is None:
+        return (x > y) - (x < y)
+    return comp(x, y)
+def max_by(comp, x, y):
+    """
+    Finds the greater of two sort keys
+    :param comp: a comparison function, or None to compare keys natively
+    :return: the greater key
+    """
+    return x if compare(x, y, comp) >= 0 else y
+def min_by(comp, x, y):
+    """
+    Finds the lesser of two sort keys
+    :param comp: a comparison function, or None to compare keys natively
+    :return: the lesser key
+    """
+    return x if compare(x, y, comp) <= 0 else y
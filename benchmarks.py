@@ -0,0 +1,207 @@
+######################
+# benchmarks.py
+######################
+"""
+Timing and memory benchmarks for the data structures. Run this file directly
+to print every benchmark, or call a single benchmark function.
+"""
+import collections
+import random
+import threading
+import time
+import tracemalloc
+import Deque
+import Graph
+import TreeSet as treeset
+from Hashmap import HashMap, ConcurrentHashMap
+from TreeSet import TreeSet, SortedListSet
+class LockedHashMap:
+    """
+    A HashMap with every operation serialized behind one lock, the baseline
+    the concurrent hashmap is measured against
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.map = HashMap()
+        self.lock = threading.Lock()
+    def get(self, key, default=None):
+        """
+        Gets the value of a key under the lock
+        :param key: The key we're looking for
+        :param default: value given if the key isn't in the map
+        """
+        with self.lock:
+            if key in self.map:
+                return self.map[key]
+            return default
+    def __setitem__(self, key, value):
+        """
+        Sets a pair under the lock
+        :param key: key for the pair
+        :param value: value associated with key
+        """
+        with self.lock:
+            self.map[key] = value
+def run_mixed(shared, threads, ops, read_ratio, keys):
+    """
+    Runs a mix of reads and writes against a map from several threads
+    :param shared: the map being measured
+    :param threads: number of worker threads
+    :param ops: operations done by each thread
+    :param read_ratio: fraction of operations that are reads
+    :param keys: number of distinct keys used
+    :return: seconds taken for every thread to finish
+    """
+    def work(seed):
+        r = random.Random(seed)
+        for _ in range(ops):
+            key = r.randrange(keys)
+            if r.random() < read_ratio:
+                shared.get(key)
+            else:
+                shared[key] = key
+    workers = [threading.Thread(target=work, args=(n,)) for n in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - start
+def bench_concurrent_hashmap(threads=4, ops=50000, keys=10000,
+                             read_ratios=(.5, .9, .99)):
+    """
+    Compares ConcurrentHashMap to a HashMap behind a single lock over several
+    read/write ratios
+    :param threads: number of worker threads
+    :param ops: operations done by each thread
+    :param keys: number of distinct keys used
+    :param read_ratios: fractions of operations that are reads
+    """
+    print('concurrent hashmap: {0} threads x {1} ops'.format(threads, ops))
+    for ratio in read_ratios:
+        for name, make in (('single lock', LockedHashMap),
+                           ('striped', ConcurrentHashMap)):
+            shared = make()
+            # preload so reads mostly hit
+            for key in range(keys):
+                shared[key] = key
+            seconds = run_mixed(shared, threads, ops, ratio, keys)
+            print('  reads {0:>4.0%}  {1:<12} {2:>10.0f} ops/s'.format(
+                ratio, name, threads * ops / seconds))
+def measure(make):
+    """
+    Measures the memory a structure holds once it has been built
+    :param make: function building the structure
+    :return: (the structure, bytes allocated for it)
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    built = make()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return built, after - before
+def bench_treeset_backends(n=1000000, lookups=200000):
+    """
+    Compares the node based TreeSet to the block based SortedListSet on
+    memory, bulk loading, lookups and iteration
+    :param n: number of items in each set
+    :param lookups: number of membership tests timed
+    """
+    r = random.Random(0)
+    items = r.sample(range(4 * n), n)
+    probes = [r.randrange(4 * n) for _ in range(lookups)]
+    print('treeset backends: {0} int items'.format(n))
+    for name, make in (('TreeSet', TreeSet), ('SortedListSet', SortedListSet)):
+        start = time.perf_counter()
+        tree, size = measure(lambda: make(items=items))
+        load = time.perf_counter() - start
+        start = time.perf_counter()
+        for item in probes:
+            item in tree
+        lookup = time.perf_counter() - start
+        start = time.perf_counter()
+        for item in tree:
+            pass
+        walk = time.perf_counter() - start
+        print('  {0:<14} {1:>6.1f} bytes/item  load {2:>5.2f}s  '
+              '{3:>9.0f} lookups/s  iterate {4:>5.3f}s'.format(
+                  name, size / n, load, lookups / lookup, walk))
+def without_slots(cls):
+    """
+    Copies a slotted class into one whose instances keep their attributes in
+    a dict, the way the class stored them before it had slots
+    :param cls: a class with __slots__
+    :return: the copied class
+    """
+    namespace = {name: value for name, value in vars(cls).items()
+                 if name not in cls.__slots__ and name != '__slots__'}
+    return type(cls.__name__, cls.__bases__, namespace)
+def bench_node_memory(n=200000):
+    """
+    Measures the bytes per element of the structures built from one node
+    object per element, with their node classes slotted and with a copy of
+    each class that isn't
+    :param n: number of elements in each structure
+    """
+    items = list(range(n))
+    def fill_deque():
+        deque = Deque.Deque()
+        for item in items:
+            deque.push_back(item)
+        return deque
+    print('node memory: {0} elements'.format(n))
+    for module, name, make in (
+            (treeset, 'TreeNode', lambda: TreeSet(items=items)),
+            (Deque, 'Node', fill_deque),
+            (Graph, 'Vertex', lambda: [Graph.Vertex(item) for item in items])):
+        slotted = getattr(module, name)
+        sizes = []
+        for cls in (without_slots(slotted), slotted):
+            # the structures look their node class up in their module
+            setattr(module, name, cls)
+            try:
+                sizes.append(measure(make)[1] / n)
+            finally:
+                setattr(module, name, slotted)
+        print('  {0:<9} {1:>6.1f} bytes/element with a dict, {2:>6.1f} '
+              'with slots'.format(name, *sizes))
+def bench_deque_backends(n=1000000):
+    """
+    Compares the node based Deque, the block based BlockDeque and
+    collections.deque on memory, pushes, iteration and pops
+    :param n: number of elements pushed
+    """
+    print('deque backends: {0} elements'.format(n))
+    for name, make, push, pop in (
+            ('Deque', Deque.Deque, 'push_back', 'pop_front'),
+            ('BlockDeque', Deque.BlockDeque, 'push_back', 'pop_front'),
+            ('collections', collections.deque, 'append', 'popleft')):
+        def fill():
+            deque = make()
+            push_back = getattr(deque, push)
+            for item in range(n):
+                push_back(item)
+            return deque
+        size = measure(fill)[1]
+        start = time.perf_counter()
+        deque = fill()
+        pushes = time.perf_counter() - start
+        start = time.perf_counter()
+        for item in deque:
+            pass
+        walk = time.perf_counter() - start
+        pop_front = getattr(deque, pop)
+        start = time.perf_counter()
+        for _ in range(n):
+            pop_front()
+        pops = time.perf_counter() - start
+        print('  {0:<12} {1:>6.1f} bytes/element  push {2:>5.3f}s  iterate '
+              '{3:>5.3f}s  pop {4:>5.3f}s'.format(name, size / n, pushes, walk,
+                                                  pops))
+if __name__ == '__main__':
+    bench_concurrent_hashmap()
+    bench_treeset_backends()
+    bench_node_memory()
+    bench_deque_backends()